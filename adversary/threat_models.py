@@ -1,23 +1,37 @@
 # adversary/threat_models.py
-import random
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
 
 class Adversary:
     """Base class for adversarial agents."""
     def __init__(self, name="Benign"):
         self.name = name
 
-    def execute_source_attack(self, alice_key_bit): return alice_key_bit, 0.0
+    def execute_source_attack(self, alice_key_bit, rng: np.random.Generator):
+        """Attacks a single source bit as a batch of one. Returns the bit and its leakage."""
+        _, leakage = self.execute_source_attack_batch(np.array([alice_key_bit]), rng)
+        return alice_key_bit, float(leakage[0])
+
     def adapt_to_protocol_choice(self, mode): pass
 
+    def execute_source_attack_batch(self, alice_bits: np.ndarray, rng: np.random.Generator):
+        """Attacks a whole batch of source bits. Returns the bits and a per-bit leakage array."""
+        alice_bits = np.asarray(alice_bits)
+        return alice_bits, np.zeros(alice_bits.size, dtype=np.float32)
+
 class SourceLeakageAdversary(Adversary):
     """A simple adversary that leaks classical source bits with some probability."""
     def __init__(self, strength: float):
         super().__init__(name=f"Source Leakage ({strength:.1%})")
         self.strength = strength
-    
-    def execute_source_attack(self, alice_key_bit, rng: random.Random):
-        leakage = 1.0 if rng.random() < self.strength else 0.0
-        return alice_key_bit, leakage
+
+    def execute_source_attack_batch(self, alice_bits: np.ndarray, rng: np.random.Generator):
+        """Draws every Bernoulli leakage event for the batch in a single call."""
+        alice_bits = np.asarray(alice_bits)
+        return alice_bits, (rng.random(alice_bits.size) < self.strength).astype(np.float32)
 
 class AdaptiveAdversary(Adversary):
     """
@@ -33,11 +47,12 @@ class AdaptiveAdversary(Adversary):
         """If the controller chooses NoLock, the adversary increases its attack strength."""
         if mode == 'NoLock':
             self.current_strength = self.base_strength * 2 # Double the attack
-            print(f"[Adversary] Controller chose 'NoLock'. Increasing attack strength to {self.current_strength:.1%}")
+            logger.debug("[Adversary] Controller chose 'NoLock'. Increasing attack strength to %.1f%%", self.current_strength * 100)
         else:
             self.current_strength = self.base_strength
-            print(f"[Adversary] Controller chose 'Lock'. Maintaining attack strength at {self.current_strength:.1%}")
+            logger.debug("[Adversary] Controller chose 'Lock'. Maintaining attack strength at %.1f%%", self.current_strength * 100)
 
-    def execute_source_attack(self, alice_key_bit, rng: random.Random):
-        leakage = 1.0 if rng.random() < self.current_strength else 0.0
-        return alice_key_bit, leakage
\ No newline at end of file
+    def execute_source_attack_batch(self, alice_bits: np.ndarray, rng: np.random.Generator):
+        """Draws every Bernoulli leakage event for the batch at the current strength."""
+        alice_bits = np.asarray(alice_bits)
+        return alice_bits, (rng.random(alice_bits.size) < self.current_strength).astype(np.float32)
@@ -0,0 +1,14 @@
+# analysis/_bits.py
+
+import numpy as np
+
+def as_bit_array(bits) -> np.ndarray:
+    """Returns a sifted bit stream as a contiguous uint8 array."""
+    return np.asarray(bits, dtype=np.uint8)
+
+def count_bit_errors(bits_a, bits_b) -> int:
+    """Counts the positions where two sifted bit streams disagree."""
+    a = as_bit_array(bits_a)
+    b = as_bit_array(bits_b)
+    n = min(a.size, b.size)
+    return int(np.count_nonzero(a[:n] ^ b[:n]))
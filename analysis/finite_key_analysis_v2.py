@@ -1,9 +1,13 @@
 # analysis/finite_key_analysis_v2.py
 
+import functools
 import math
 import numpy as np
 from typing import Dict
 
+from analysis.key_rate import EC_EFFICIENCY
+from utils.entropy import shannon_entropy_vec
+
 # =============================================================================
 # TEAL Simulator - Finite-Key Security Analysis Engine
 # =============================================================================
@@ -13,11 +17,10 @@ from typing import Dict
 # concentration inequalities (Chernoff-Hoeffding bounds).
 # =============================================================================
 
-def shannon_entropy(p: float) -> float:
-    """Calculates the binary Shannon entropy H(p)."""
-    if p <= 0 or p >= 1:
-        return 0.0
-    return -p * math.log2(p) - (1 - p) * math.log2(1 - p)
+@functools.lru_cache(maxsize=32)
+def _ch_factor(security_parameter: float) -> float:
+    """Returns sqrt(ln(1/eps) / 2), the sample-size independent part of the bound."""
+    return math.sqrt(math.log(1.0 / security_parameter) / 2.0)
 
 def chernoff_hoeffding_bound(
     num_errors: int,
@@ -40,17 +43,46 @@ def chernoff_hoeffding_bound(
         return 1.0 # Worst-case scenario if we have no data
         
     observed_rate = num_errors / num_samples
-    delta = math.sqrt(math.log(1 / security_parameter) / (2 * num_samples))
+    delta = _ch_factor(security_parameter) / math.sqrt(num_samples)
     
     return min(1.0, observed_rate + delta)
 
+def _finite_key_terms(
+    sifted_key_len, num_errors, total_initial_qubits,
+    security_parameter_qber, source_leakage_rate, error_correction_efficiency
+):
+    """
+    The finite-key model element-wise over broadcast arrays: returns the
+    observed QBER, its Chernoff-Hoeffding upper bound and the secure key rate.
+    """
+    n = np.asarray(sifted_key_len, dtype=float)
+
+    # --- Step 1: Robust Parameter Estimation ---
+    # We don't use the observed QBER directly. We calculate its pessimistic
+    # upper bound using a concentration inequality.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        qber_observed = np.where(n > 0, np.asarray(num_errors, dtype=float) / n, 0.0)
+        delta = np.sqrt(np.log(1.0 / np.asarray(security_parameter_qber, dtype=float)) / 2.0) / np.sqrt(n)
+    # An empty sample gives delta = inf, i.e. the worst-case bound of 1.0.
+    qber_upper_bound = np.minimum(1.0, qber_observed + delta)
+
+    # --- Step 2: Calculate Secure Key Rate using the Pessimistic Bound ---
+    # All terms in the security proof must now use the worst-case QBER.
+    # Eve's information uses the bound; error correction depends on observed errors.
+    # The final rate is reduced by all leakage terms.
+    rate = (n / total_initial_qubits) * (
+        1 - shannon_entropy_vec(qber_upper_bound) - shannon_entropy_vec(source_leakage_rate)
+        - error_correction_efficiency * shannon_entropy_vec(qber_observed)
+    )
+    return qber_observed, qber_upper_bound, np.maximum(0.0, rate)
+
 def calculate_finite_key_rate(
     sifted_key_len: int,
     num_errors: int,
     total_initial_qubits: int,
     security_parameter_qber: float = 1e-9,
     source_leakage_rate: float = 0.0,
-    error_correction_efficiency: float = 1.1
+    error_correction_efficiency: float = EC_EFFICIENCY
 ) -> Dict[str, float]:
     """
     Calculates the secure key rate under a finite-key analysis.
@@ -58,28 +90,32 @@ def calculate_finite_key_rate(
     if sifted_key_len == 0:
         return {'qber_obs': 0, 'qber_bound': 1.0, 'secure_key_rate': 0.0}
 
-    # --- Step 1: Robust Parameter Estimation ---
-    # We don't use the observed QBER directly. We calculate its pessimistic
-    # upper bound using a concentration inequality.
-    qber_observed = num_errors / sifted_key_len
-    qber_upper_bound = chernoff_hoeffding_bound(num_errors, sifted_key_len, security_parameter_qber)
-
-    # --- Step 2: Calculate Secure Key Rate using the Pessimistic Bound ---
-    sifting_efficiency = sifted_key_len / total_initial_qubits
-
-    # All terms in the security proof must now use the worst-case QBER.
-    eve_info_from_channel = shannon_entropy(qber_upper_bound)
-    eve_info_from_leakage = shannon_entropy(source_leakage_rate)
-    bob_error_correction_cost = error_correction_efficiency * shannon_entropy(qber_observed) # Correction depends on observed errors
-
-    # The final rate is reduced by all leakage terms.
-    rate = sifting_efficiency * (1 - eve_info_from_channel - eve_info_from_leakage - bob_error_correction_cost)
-    
-    secure_rate = max(0.0, rate)
+    qber_observed, qber_upper_bound, secure_rate = map(float, _finite_key_terms(
+        sifted_key_len, num_errors, total_initial_qubits,
+        security_parameter_qber, source_leakage_rate, error_correction_efficiency
+    ))
 
     return {
         'qber_obs': qber_observed,
         'qber_bound': qber_upper_bound,
         'secure_key_rate': secure_rate,
         'sifted_key_length': sifted_key_len
-    }
\ No newline at end of file
+    }
+
+def calculate_finite_key_rate_batch(
+    sifted_key_len,
+    num_errors,
+    total_initial_qubits,
+    security_parameter_qber=1e-9,
+    source_leakage_rate=0.0,
+    error_correction_efficiency=EC_EFFICIENCY
+) -> np.ndarray:
+    """
+    Vectorized `calculate_finite_key_rate` for parameter sweeps. Every argument
+    may be a scalar or an array; they broadcast against each other and the
+    secure key rate of each sweep point is returned as a float array.
+    """
+    return _finite_key_terms(
+        sifted_key_len, num_errors, total_initial_qubits,
+        security_parameter_qber, source_leakage_rate, error_correction_efficiency
+    )[2]
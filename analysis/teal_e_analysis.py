@@ -1,33 +1,32 @@
 # analysis/teal_e_analysis.py
-import math
+import numpy as np
 
-def shannon_entropy(p: float) -> float:
-    if p <= 0 or p >= 1: return 0.0
-    return -p * math.log2(p) - (1 - p) * math.log2(1 - p)
+from analysis._bits import count_bit_errors
+from analysis.key_rate import EC_EFFICIENCY
+from utils.entropy import shannon_entropy
 
 def run_teal_e_analysis(
-    sifted_alice: list,
-    sifted_bob: list,
+    sifted_alice: np.ndarray,
+    sifted_bob: np.ndarray,
     total_initial_qubits: int,
     source_leakage_prob: float = 0.0,
-    error_correction_efficiency: float = 1.1
+    error_correction_efficiency: float = EC_EFFICIENCY
 ) -> dict:
     """
     The definitive analysis engine for the TEAL-E protocol.
+    The sifted keys are uint8 bit arrays (any 0/1 sequence is accepted).
     """
     sifted_len = len(sifted_alice)
     if sifted_len == 0:
         return {'qber': 0, 'secure_key_rate': 0, 'sifted_key_length': 0}
 
-    errors = sum(a != b for a, b in zip(sifted_alice, sifted_bob))
+    errors = count_bit_errors(sifted_alice, sifted_bob)
     qber = errors / sifted_len
     sifting_eff = sifted_len / total_initial_qubits
     
-    # TEAL-E is architecturally immune to source leakage, so we set it to 0.
-    eve_info = shannon_entropy(qber) + shannon_entropy(0.0)
-    bob_cost = error_correction_efficiency * shannon_entropy(qber)
-    
-    rate = sifting_eff * (1 - eve_info - bob_cost)
+    # TEAL-E is architecturally immune to source leakage, so H(leakage) = 0 and
+    # only Eve's H(q) and Bob's error-correction cost remain.
+    rate = sifting_eff * (1 - (1 + error_correction_efficiency) * shannon_entropy(qber))
     
     return {
         'qber': qber,
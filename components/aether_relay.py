@@ -1,7 +1,8 @@
 # components/aether_relay.py
 
-import random
-from typing import Dict, Any
+import numpy as np
+
+from components.bsm import BSM_FAIL, BSM_PSI_PLUS, BSM_PSI_MINUS, BSM_PHI_PLUS, BSM_PHI_MINUS
 
 def simulate_perfect_bsm(
     qubit_a,
@@ -10,26 +11,27 @@ def simulate_perfect_bsm(
     bob_bit: int,
     alice_basis: int,
     bob_basis: int,
-    rng: random.Random
-) -> str:
+    rng: np.random.Generator
+) -> int:
     """
     Simulates a perfect, next-generation Bell State Measurement (BSM) device.
 
     This advanced relay can distinguish all four Bell states with 100% efficiency.
     This is the theoretical maximum performance for an MDI relay.
+    Returns one of the integer BSM_* announcement codes from components.bsm.
     """
     if qubit_a is None or qubit_b is None:
-        return "fail" # Photon loss is the only reason for failure
+        return BSM_FAIL # Photon loss is the only reason for failure
 
     # The BSM outcome is deterministically determined by the input states.
     if alice_basis == bob_basis: # Matched Bases
         if alice_bit == bob_bit:
             # e.g., |0>|0> or |+>|+>. These project to the Phi+ or Psi+ states.
             # We will assign them to two distinct success types.
-            return "phi_plus" if rng.random() < 0.5 else "psi_plus"
+            return BSM_PHI_PLUS if rng.random() < 0.5 else BSM_PSI_PLUS
         else: # alice_bit != bob_bit
             # e.g., |0>|1> or |+>|->. These project to the Phi- or Psi- states.
-            return "phi_minus" if rng.random() < 0.5 else "psi_minus"
+            return BSM_PHI_MINUS if rng.random() < 0.5 else BSM_PSI_MINUS
             
     else: # Mismatched Bases
         # Even with mismatched bases, the two-qubit state is always one of the four
@@ -37,7 +39,7 @@ def simulate_perfect_bsm(
         # The specific outcome determines the correlation. For simplicity, we
         # assign them to the four outcomes with equal probability.
         outcome = rng.random()
-        if outcome < 0.25: return "psi_minus"
-        elif outcome < 0.50: return "psi_plus"
-        elif outcome < 0.75: return "phi_minus"
-        else: return "phi_plus"
\ No newline at end of file
+        if outcome < 0.25: return BSM_PSI_MINUS
+        elif outcome < 0.50: return BSM_PSI_PLUS
+        elif outcome < 0.75: return BSM_PHI_MINUS
+        else: return BSM_PHI_PLUS
\ No newline at end of file
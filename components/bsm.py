@@ -0,0 +1,82 @@
+# components/bsm.py
+
+import numpy as np
+
+# Bell-State Measurement announcements as small integer codes, so outcomes can
+# be stored in uint8 arrays and compared without string hashing. FAIL is 0,
+# which keeps `if announcement:` meaning "the BSM succeeded".
+BSM_FAIL = 0
+BSM_PSI_PLUS = 1
+BSM_PSI_MINUS = 2
+# Only a perfect relay (components.aether_relay) also resolves the Phi states.
+BSM_PHI_PLUS = 3
+BSM_PHI_MINUS = 4
+
+# Membership masks over the codes: bit c is set when code c is in the set.
+# The "minus" outcomes tell Bob to flip his bit during sifting.
+BSM_MINUS_MASK = (1 << BSM_PSI_MINUS) | (1 << BSM_PHI_MINUS)
+
+BSM_DTYPE = np.uint8
+
+# Probability that a physically-modelled linear-optics BSM on two photons that
+# reached the relay in matching bases succeeds (a Psi+ or Psi- click).
+BSM_SUCCESS_PROB = 0.25
+
+def bsm_requires_flip(announcement):
+    """
+    True where an announcement (a code or an array of codes) is a "minus"
+    outcome, via one shift-and-mask test against BSM_MINUS_MASK.
+    """
+    return ((1 << announcement) & BSM_MINUS_MASK) != 0
+
+def simulate_bsm(qubit_a, qubit_b, alice_bit, bob_bit, alice_basis, bob_basis, rng) -> int:
+    """
+    Scalar form of the simplified MDI BSM that `bsm_success_mask` and
+    `bsm_announcements` model for whole batches. A lost photon (None) or
+    mismatched bases fail; otherwise the BSM succeeds half the time,
+    announcing Psi+ for identical inputs and Psi- for orthogonal ones.
+    """
+    if qubit_a is None or qubit_b is None or alice_basis != bob_basis:
+        return BSM_FAIL
+    if rng.random() >= 0.5:
+        return BSM_FAIL
+    return BSM_PSI_PLUS if alice_bit == bob_bit else BSM_PSI_MINUS
+
+def bsm_announcements(success: np.ndarray, same_bit: np.ndarray) -> np.ndarray:
+    """
+    Branchless BSM outcomes for a batch of rounds. Successful rounds announce
+    Psi+ for identical inputs and Psi- for orthogonal ones; every other round
+    is a FAIL. Returns a BSM_DTYPE array of announcement codes.
+    """
+    return np.where(success, np.where(same_bit, BSM_PSI_PLUS, BSM_PSI_MINUS), BSM_FAIL).astype(BSM_DTYPE)
+
+def bsm_success_mask(
+    alice_bases: np.ndarray, bob_bases: np.ndarray, channel_loss_prob: float,
+    rng: np.random.Generator, success_prob: float = 0.5
+) -> np.ndarray:
+    """
+    Fused channel + BSM pass for a batch of MDI rounds. A round succeeds when
+    both photons survive their lossy channels, the bases match and the BSM
+    clicks (probability `success_prob`). Only survival matters, so no qubit
+    states are built; the three uniform draws share one call and the
+    conditions are folded into a single bool mask in place.
+    """
+    if not 0.0 <= channel_loss_prob <= 1.0:
+        raise ValueError("loss_probability must be between 0 and 1.")
+    loss_a, loss_b, bsm_draw = rng.random((3,) + np.shape(alice_bases))
+    success = loss_a >= channel_loss_prob
+    success &= loss_b >= channel_loss_prob
+    success &= alice_bases == bob_bases
+    success &= bsm_draw < success_prob
+    return success
+
+def sift_bsm_rounds(alice_key: np.ndarray, bob_key: np.ndarray, success: np.ndarray):
+    """
+    The shared MDI sifting kernel. Given each round's bits and a mask of
+    successful BSMs, announces the outcomes and keeps the successful rounds:
+    returns (sifted_alice, sifted_bob) with Bob's bit already flipped on Psi-
+    announcements. Boolean indexing keeps the rounds in their original order.
+    """
+    announcement = bsm_announcements(success, alice_key == bob_key)
+    sifted = announcement != BSM_FAIL
+    return alice_key[sifted], (bob_key ^ bsm_requires_flip(announcement))[sifted]
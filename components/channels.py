@@ -1,6 +1,8 @@
 # components/channels.py
 
-import random
+import numpy as np
+
+from utils.rng import DEFAULT_RNG
 
 # MODIFICATION: The function now accepts an optional 'rng' object for reproducibility.
 def apply_lossy_channel(photon_state, loss_probability: float, rng=None):
@@ -14,33 +16,37 @@ def apply_lossy_channel(photon_state, loss_probability: float, rng=None):
     if not 0.0 <= loss_probability <= 1.0:
         raise ValueError("loss_probability must be between 0 and 1.")
 
-    # Use the provided random generator if it exists, otherwise use the global one.
-    rand_gen = rng if rng is not None else random
+    # Use the provided random generator if it exists, otherwise the shared default.
+    rand_gen = rng if rng is not None else DEFAULT_RNG
 
     if rand_gen.random() < loss_probability:
         return None  # Photon is lost
     else:
         return photon_state  # Photon is transmitted successfully
 
+def lossy_channel_survival_mask(loss_probability: float, shape, rng: np.random.Generator) -> np.ndarray:
+    """
+    Vectorized `apply_lossy_channel` for a whole batch of photons. The channel
+    never touches the amplitudes, so only the outcome is returned: a bool
+    array of the given shape that is True where the photon was transmitted.
+    """
+    if not 0.0 <= loss_probability <= 1.0:
+        raise ValueError("loss_probability must be between 0 and 1.")
+    return rng.random(shape) >= loss_probability
+
 if __name__ == "__main__":
     # --- Test Block ---
-    my_photon = "qubit_state_0"
     loss_prob = 0.3
-    num_simulations = 1000
-    transmitted_count = 0
-    lost_count = 0
+    num_simulations = 1_000_000
     
-    # Test with a specific RNG instance for reproducibility
-    test_rng = random.Random(123)
+    # Test with a specific RNG instance for reproducibility. The batched mask
+    # draws every trial at once, so a million trials cost milliseconds.
+    test_rng = np.random.default_rng(123)
 
     print("Starting simulation...")
-    for i in range(num_simulations):
-        # MODIFICATION: Pass the RNG to the function
-        result = apply_lossy_channel(my_photon, loss_prob, rng=test_rng)
-        if result is None:
-            lost_count += 1
-        else:
-            transmitted_count += 1
+    transmitted = lossy_channel_survival_mask(loss_prob, num_simulations, test_rng)
+    transmitted_count = int(np.count_nonzero(transmitted))
+    lost_count = num_simulations - transmitted_count
 
     print("Simulation finished.")
     print(f"Photons successfully transmitted: {transmitted_count}")
@@ -48,4 +54,4 @@ if __name__ == "__main__":
 
     measured_loss_rate = lost_count / num_simulations
     print(f"\nExpected loss rate: {loss_prob:.2f}")
-    print(f"Measured loss rate: {measured_loss_rate:.2f}")
\ No newline at end of file
+    print(f"Measured loss rate: {measured_loss_rate:.4f}")
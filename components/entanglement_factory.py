@@ -1,10 +1,12 @@
 # components/entanglement_factory.py
 
-import random
-from typing import List, Tuple
+import logging
 
-from components.sources import prepare_bb84_qubit
-from components.channels import apply_lossy_channel
+import numpy as np
+
+from components.channels import lossy_channel_survival_mask
+
+logger = logging.getLogger(__name__)
 
 class EntanglementFactory:
     """
@@ -16,36 +18,25 @@ class EntanglementFactory:
         self.alice_channel_loss = alice_channel_loss
         self.bob_channel_loss = bob_channel_loss
         self.bsm_success_prob = bsm_success_prob
-        print("Entanglement Factory initialized.")
-
-    def _simulate_bsm(self, qubit_a, qubit_b, rng):
-        if qubit_a is None or qubit_b is None: return False
-        return rng.random() < self.bsm_success_prob
+        logger.debug("Entanglement Factory initialized.")
 
-    def generate_entangled_pairs(self, num_attempts: int, rng: random.Random) -> List[bool]:
+    def generate_entangled_pairs(self, num_attempts: int, rng: np.random.Generator) -> np.ndarray:
         """
         Runs the MDI process to generate a "bank" of virtual entangled pairs.
+        Every loss and BSM event for the whole bank is drawn in one batch.
 
         Returns:
-            A list of booleans of length `num_attempts`, where `True` indicates
+            A bool array of length `num_attempts`, where `True` indicates
             a successfully generated entangled pair for that round.
         """
-        print(f"[Factory] Attempting to generate {num_attempts} entangled pairs...")
+        logger.debug("[Factory] Attempting to generate %d entangled pairs...", num_attempts)
         
-        successful_pairs = []
-        for _ in range(num_attempts):
-            # For entanglement generation, Alice and Bob can use fixed, known states.
-            # e.g., Alice always sends |0> and Bob always sends |+>
-            qubit_a = prepare_bb84_qubit(0, 0)
-            qubit_b = prepare_bb84_qubit(0, 1)
-
-            qubit_a_after_channel = apply_lossy_channel(qubit_a, self.alice_channel_loss, rng)
-            qubit_b_after_channel = apply_lossy_channel(qubit_b, self.bob_channel_loss, rng)
-
-            if self._simulate_bsm(qubit_a_after_channel, qubit_b_after_channel, rng):
-                successful_pairs.append(True)
-            else:
-                successful_pairs.append(False)
+        # For entanglement generation, Alice and Bob use fixed, known states
+        # (e.g. |0> and |+>); the states never affect the outcome, so only the
+        # two channel survivals and the BSM success are simulated.
+        alice_arrived = lossy_channel_survival_mask(self.alice_channel_loss, num_attempts, rng)
+        bob_arrived = lossy_channel_survival_mask(self.bob_channel_loss, num_attempts, rng)
+        successful_pairs = alice_arrived & bob_arrived & (rng.random(num_attempts) < self.bsm_success_prob)
         
-        print(f"[Factory] Successfully generated {sum(successful_pairs)} pairs.")
-        return successful_pairs
\ No newline at end of file
+        logger.debug("[Factory] Successfully generated %d pairs.", np.count_nonzero(successful_pairs))
+        return successful_pairs
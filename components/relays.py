@@ -1,10 +1,10 @@
 # components/relays.py
 
 import numpy as np
-import random
 
 # Import state definitions from the sources module
-from components.sources import prepare_bb84_qubit, STATE_0, STATE_1, STATE_PLUS, STATE_MINUS
+from components.sources import STATE_0, STATE_PLUS, _BB84_STATE_TABLE
+from utils.rng import DEFAULT_RNG
 
 def measure_qubit(photon_state, basis_choice: int, rng=None):
     """
@@ -17,8 +17,8 @@ def measure_qubit(photon_state, basis_choice: int, rng=None):
     if basis_choice not in [0, 1]:
         raise ValueError(f"Invalid basis_choice: {basis_choice}. Must be 0 or 1.")
 
-    # Use the provided random generator if it exists, otherwise use the global one.
-    rand_gen = rng if rng is not None else random
+    # Use the provided random generator if it exists, otherwise the shared default.
+    rand_gen = rng if rng is not None else DEFAULT_RNG
     
     # Select the measurement basis vectors
     if basis_choice == 0:  # Z-basis
@@ -36,5 +36,15 @@ def measure_qubit(photon_state, basis_choice: int, rng=None):
     else:
         return 1
 
+def measure_qubits(photon_states: np.ndarray, basis_choices: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Vectorized `measure_qubit` for an (N, 2) array of states, one basis choice
+    per row (0 or 1, unchecked). Returns the N outcomes as a uint8 array.
+    """
+    # The '0' outcome vector of each basis is the bit-0 entry of the state table.
+    basis_0_vectors = _BB84_STATE_TABLE[basis_choices, 0]
+    prob_0 = np.abs(np.vecdot(basis_0_vectors, photon_states))**2
+    return (rng.random(len(photon_states)) >= prob_0).astype(np.uint8)
+
 # The __main__ block is no longer needed as we now have a dedicated test file.
 # You can delete it or leave it, but we will rely on test_components.py from now on.
\ No newline at end of file
@@ -1,14 +1,32 @@
 # components/sources.py
 
+import functools
+
 import numpy as np
 
+from utils.quantum_ops import COMPLEX_DTYPE
+
 # 1. Quantum State Definitions
 # Define the four BB84 quantum states as numpy arrays.
-# Using dtype=complex is good practice for quantum states.
-STATE_0 = np.array([1, 0], dtype=complex)
-STATE_1 = np.array([0, 1], dtype=complex)
-STATE_PLUS = (STATE_0 + STATE_1) / np.sqrt(2)
-STATE_MINUS = (STATE_0 - STATE_1) / np.sqrt(2)
+_INV_SQRT2 = 0.7071067811865476 # 1/sqrt(2)
+STATE_0 = np.array([1, 0], dtype=COMPLEX_DTYPE)
+STATE_1 = np.array([0, 1], dtype=COMPLEX_DTYPE)
+STATE_PLUS = np.array([_INV_SQRT2, _INV_SQRT2], dtype=COMPLEX_DTYPE)
+STATE_MINUS = np.array([_INV_SQRT2, -_INV_SQRT2], dtype=COMPLEX_DTYPE)
+
+# prepare_bb84_qubit hands out these module-level arrays by reference, so
+# they are read-only: an in-place update downstream raises instead of
+# silently corrupting every later state.
+for _state in (STATE_0, STATE_1, STATE_PLUS, STATE_MINUS):
+    _state.setflags(write=False)
+del _state
+
+# Lookup table indexed as [basis_choice][bit_to_send]:
+# basis 0 is Rectilinear (Z) {|0>, |1>}, basis 1 is Diagonal (X) {|+>, |->}.
+_BB84_STATES = ((STATE_0, STATE_1), (STATE_PLUS, STATE_MINUS))
+# The same table as a (2, 2, 2) array, for fancy-indexing whole blocks of qubits.
+_BB84_STATE_TABLE = np.array(_BB84_STATES)
+_BB84_STATE_TABLE.setflags(write=False)
 
 def prepare_bb84_qubit(bit_to_send: int, basis_choice: int):
     """
@@ -29,22 +47,57 @@ def prepare_bb84_qubit(bit_to_send: int, basis_choice: int):
     Raises:
         ValueError: If bit_to_send or basis_choice are not 0 or 1.
     """
-    if bit_to_send not in [0, 1]:
+    if bit_to_send not in (0, 1):
         raise ValueError(f"Invalid bit_to_send: {bit_to_send}. Must be 0 or 1.")
-    if basis_choice not in [0, 1]:
+    if basis_choice not in (0, 1):
         raise ValueError(f"Invalid basis_choice: {basis_choice}. Must be 0 or 1.")
 
-    # Select the state based on the bit and basis choice
-    if basis_choice == 0:  # Rectilinear (Z) basis
-        if bit_to_send == 0:
-            return STATE_0
-        else:  # bit_to_send == 1
-            return STATE_1
-    else:  # basis_choice == 1, Diagonal (X) basis
-        if bit_to_send == 0:
-            return STATE_PLUS
-        else:  # bit_to_send == 1
-            return STATE_MINUS
+    # Equal-valued floats and bools pass the check above, so index with ints.
+    return _BB84_STATES[int(basis_choice)][int(bit_to_send)]
+
+def prepare_bb84_qubits(bits: np.ndarray, bases: np.ndarray) -> np.ndarray:
+    """
+    Batched `prepare_bb84_qubit`: one fancy-index into the state table turns
+    N (bit, basis) pairs into an (N, 2) array with one qubit per row. The
+    result is a fresh, writable array. Inputs must be 0/1 arrays.
+    """
+    return _BB84_STATE_TABLE[bases, bits]
+
+def _build_bb84_product_states(bits: np.ndarray, bases: np.ndarray) -> np.ndarray:
+    qubits = _BB84_STATE_TABLE[bases, bits] # (num_blocks, block_size, 2)
+    states = qubits[:, 0]
+    for i in range(1, qubits.shape[1]):
+        states = (states[:, :, None] * qubits[:, i, None, :]).reshape(len(qubits), -1)
+    return states
+
+# Blocks of up to this many qubits have all 4^n of their product states
+# precomputed (8^n amplitudes, 2 MB at n = 6), so preparing them is a gather.
+_PRODUCT_TABLE_MAX_QUBITS = 6
+
+@functools.lru_cache(maxsize=None)
+def _bb84_product_state_table(block_size: int) -> np.ndarray:
+    """Every product state of `block_size` BB84 qubits, row (bases << block_size) | bits."""
+    labels = np.arange(4**block_size)[:, None]
+    shifts = np.arange(block_size - 1, -1, -1)
+    table = _build_bb84_product_states((labels >> shifts) & 1, (labels >> (block_size + shifts)) & 1)
+    table.setflags(write=False)
+    return table
+
+def prepare_bb84_product_states(bits: np.ndarray, bases: np.ndarray) -> np.ndarray:
+    """
+    Prepares the tensor product of one BB84 qubit per (bit, basis) pair for
+    every block: `bits` and `bases` are (num_blocks, block_size) 0/1 arrays
+    and row b of the result is the product state of block b, shape
+    (num_blocks, 2**block_size), with the first qubit as the most significant
+    (the same layout as chaining np.kron). Small blocks are gathered from a
+    per-size table of every possible state.
+    """
+    block_size = bits.shape[1]
+    if block_size <= _PRODUCT_TABLE_MAX_QUBITS:
+        # Each block's bits and bases, read MSB first, form its table row.
+        weights = 1 << np.arange(block_size - 1, -1, -1)
+        return _bb84_product_state_table(block_size)[((bases @ weights) << block_size) | (bits @ weights)]
+    return _build_bb84_product_states(bits, bases)
 
 if __name__ == "__main__":
     # --- Test Block ---
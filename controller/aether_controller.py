@@ -1,22 +1,42 @@
 # controller/aether_controller.py
-import random
+import logging
+from typing import Any, Dict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
 
 class AETHERController:
+    """
+    Strategic controller that picks TEAL or TEAL-E for an environment. The
+    decision is split into `run_diagnostics` (noisy estimates) and
+    `choose_protocol_from_stats`; `choose_protocol` runs both in one call.
+    """
     def __init__(self, noise_threshold: float = 0.01, leakage_threshold: float = 0.01):
         self.noise_threshold = noise_threshold
         self.leakage_threshold = leakage_threshold
-        print("AETHER Strategic Controller Initialized.")
+        logger.debug("AETHER Strategic Controller Initialized.")
 
-    def choose_protocol(self, true_noise: float, true_leakage: float, rng: random.Random) -> str:
-        """Makes the strategic decision of which protocol to deploy."""
-        print(f"\n[AETHER Controller] Diagnosing environment...")
-        est_noise = true_noise + rng.normalvariate(0, 0.002)
-        est_leakage = true_leakage + rng.normalvariate(0, 0.005)
-        print(f"[AETHER Controller] Diagnostics complete: Est. Noise = {max(0,est_noise):.2%}, Est. Leakage = {max(0,est_leakage):.2%}")
+    def run_diagnostics(self, true_noise, true_leakage, rng: np.random.Generator) -> Dict[str, Any]:
+        """Noisy estimates of the environment's noise and leakage."""
+        logger.debug("[AETHER Controller] Diagnosing environment...")
+        est_noise = true_noise + rng.normal(0, 0.002)
+        est_leakage = true_leakage + rng.normal(0, 0.005)
+        return {'est_noise': est_noise, 'est_leakage': est_leakage}
+
+    def choose_protocol_from_stats(self, stats: Dict[str, float]) -> str:
+        """Makes the strategic decision from a single `run_diagnostics` result."""
+        est_noise, est_leakage = stats['est_noise'], stats['est_leakage']
+        logger.debug("[AETHER Controller] Diagnostics complete: Est. Noise = %.2f%%, Est. Leakage = %.2f%%",
+                     max(0, est_noise) * 100, max(0, est_leakage) * 100)
         
         if est_leakage > self.leakage_threshold or est_noise > self.noise_threshold:
-            print("  -> Decision: Hostile environment. Deploying resilient TEAL Fortress.")
+            logger.debug("  -> Decision: Hostile environment. Deploying resilient TEAL Fortress.")
             return "TEAL"
         else:
-            print("  -> Decision: Clean environment. Deploying high-efficiency TEAL-E Racer.")
-            return "TEAL-E"
\ No newline at end of file
+            logger.debug("  -> Decision: Clean environment. Deploying high-efficiency TEAL-E Racer.")
+            return "TEAL-E"
+
+    def choose_protocol(self, true_noise: float, true_leakage: float, rng: np.random.Generator) -> str:
+        """Makes the strategic decision of which protocol to deploy."""
+        return self.choose_protocol_from_stats(self.run_diagnostics(true_noise, true_leakage, rng))
@@ -1,13 +1,51 @@
 # controller/immune_system.py
 
-import random
+import logging
 import numpy as np
-import math
-from typing import Dict, Any
+from typing import Dict, Any, NamedTuple, Tuple
 
-# --- We must import the physical components to run a real simulation ---
-from components.sources import prepare_bb84_qubit
-from components.channels import apply_lossy_channel
+from components.bsm import BSM_FAIL, BSM_SUCCESS_PROB, bsm_announcements, bsm_requires_flip
+from utils.rng import random_bits
+
+logger = logging.getLogger(__name__)
+
+# Additive floor on the [QBER, leakage] standard errors in run_diagnostics.
+_STD_ERROR_FLOOR = np.array([0.0, 0.001])
+
+class DiagnosticStats(NamedTuple):
+    """Statistics gathered by `TEALController.run_diagnostics`."""
+    qber_mean: float
+    qber_upper_bound: float
+    leakage_upper_bound: float
+
+def _sift_and_count_errors(
+    alice_key: np.ndarray, alice_bases: np.ndarray, bob_key: np.ndarray, bob_bases: np.ndarray,
+    loss_a: np.ndarray, loss_b: np.ndarray, bsm_draw: np.ndarray, channel_loss: float
+) -> Tuple[int, int]:
+    """
+    Fused sifting pass over a batch of MDI diagnostic rounds. Returns
+    (sifted_len, errors) without gathering the sifted keys themselves.
+    """
+    # Both photons must survive their lossy channels to reach the relay.
+    # Correct physical model: BSM success depends on the relationship
+    # between the states Alice and Bob *actually sent*. With matching bases,
+    # identical states project to Psi+ (or Phi+) and orthogonal states to
+    # Psi- (or Phi-), each succeeding BSM_SUCCESS_PROB (25%) of the time. Different bases give
+    # a random outcome that cannot be used for key, so they count as a fail.
+    # The conditions are folded into a single mask in place.
+    success = loss_a >= channel_loss
+    success &= loss_b >= channel_loss
+    success &= alice_bases == bob_bases
+    success &= bsm_draw < BSM_SUCCESS_PROB
+    announcement = bsm_announcements(success, alice_key == bob_key)
+
+    # Sift on every non-FAIL announcement. A Psi- announcement means Bob flips
+    # his bit; an error is a sifted round where his bit still differs from Alice's.
+    sifted = announcement != BSM_FAIL
+    reconciled_bob = bob_key ^ bsm_requires_flip(announcement)
+    sifted_errors = reconciled_bob != alice_key
+    sifted_errors &= sifted
+    return int(np.count_nonzero(sifted)), int(np.count_nonzero(sifted_errors))
 
 class TEALController:
     """
@@ -21,110 +59,74 @@ class TEALController:
         self.qber_threshold = qber_threshold
         self.leakage_threshold = leakage_threshold
         self.z_score = 1.96 # Z-score for 95% confidence
-        print(f"TEAL Controller initialized. Confidence: {confidence_level:.0%}, QBER Thresh: {qber_threshold:.1%}, Leakage Thresh: {leakage_threshold:.1%}")
+        logger.debug("TEAL Controller initialized. Confidence: %.0f%%, QBER Thresh: %.1f%%, Leakage Thresh: %.1f%%",
+                     confidence_level * 100, qber_threshold * 100, leakage_threshold * 100)
 
-    def _simulate_bsm(self, qubit_a, qubit_b, alice_bit, bob_bit, alice_basis, bob_basis, rng):
-        """
-        Internal, physically-grounded BSM simulation for diagnostics.
-        """
-        if qubit_a is None or qubit_b is None: return "fail"
-
-        # Correct physical model: BSM success depends on the relationship
-        # between the states Alice and Bob *actually sent*.
-        if alice_basis == bob_basis:
-            if alice_bit == bob_bit:
-                # States are identical (e.g., |0> & |0>). Can project to Psi+ or Phi+. Success rate is 25%.
-                return "psi_plus" if rng.random() < 0.25 else "fail"
-            else: # alice_bit != bob_bit
-                # States are orthogonal (e.g., |0> & |1>). Can project to Psi- or Phi-. Success rate is 25%.
-                return "psi_minus" if rng.random() < 0.25 else "fail"
-        else:
-            # Different bases -> random outcome, cannot be used for key. Treat as fail.
-            return "fail"
-
-    def run_diagnostics(self, num_test_rounds: int, true_channel_loss: float, true_source_leakage: float, rng: random.Random) -> Dict[str, float]:
+    def run_diagnostics(self, num_test_rounds: int, true_channel_loss: float, true_source_leakage: float, rng: np.random.Generator) -> DiagnosticStats:
         """
         Runs a full, physically-grounded MDI simulation to gather robust statistics.
         This is not a heuristic; it is a real measurement.
+        All rounds are simulated at once as NumPy arrays; `rng` may be a
+        Generator or an integer seed.
         """
-        print(f"\n[Controller] Running diagnostics with {num_test_rounds} test rounds...")
+        logger.debug("[Controller] Running diagnostics with %d test rounds...", num_test_rounds)
+        rng = np.random.default_rng(rng)
         
-        alice_key = [rng.randint(0,1) for _ in range(num_test_rounds)]
-        alice_bases = [rng.randint(0,1) for _ in range(num_test_rounds)]
-        bob_key = [rng.randint(0,1) for _ in range(num_test_rounds)]
-        bob_bases = [rng.randint(0,1) for _ in range(num_test_rounds)]
+        # Bits and bases are stored as uint8; every comparison below yields bool masks.
+        alice_key, alice_bases, bob_key, bob_bases = random_bits(rng, (4, num_test_rounds))
         
-        sifted_alice, sifted_bob = [], []
+        # Every uniform the rounds need, drawn up front: one per channel arm and one for the BSM.
+        loss_a, loss_b, bsm_draw = rng.random((3, num_test_rounds))
         
-        for i in range(num_test_rounds):
-            qubit_a = prepare_bb84_qubit(alice_key[i], alice_bases[i])
-            qubit_b = prepare_bb84_qubit(bob_key[i], bob_bases[i])
-            
-            qubit_a_after_channel = apply_lossy_channel(qubit_a, true_channel_loss, rng)
-            qubit_b_after_channel = apply_lossy_channel(qubit_b, true_channel_loss, rng)
-            
-            announcement = self._simulate_bsm(qubit_a_after_channel, qubit_b_after_channel, 
-                                              alice_key[i], bob_key[i], 
-                                              alice_bases[i], bob_bases[i], rng)
-
-            if announcement != "fail": # Sift only on BSM success, regardless of basis
-                sifted_alice.append(alice_key[i])
-                if announcement == "psi_minus": sifted_bob.append(1 - bob_key[i])
-                elif announcement == "psi_plus": sifted_bob.append(bob_key[i])
-        
-        sifted_len = len(sifted_alice)
+        sifted_len, errors = _sift_and_count_errors(
+            alice_key, alice_bases, bob_key, bob_bases, loss_a, loss_b, bsm_draw, true_channel_loss
+        )
         if sifted_len < 30: # Need a minimum number of samples for a good estimate
-            print("[Controller] Warning: Insufficient data from diagnostics. Defaulting to safe mode.")
-            return {'qber_mean': 0.5, 'qber_upper_bound': 1.0, 'leakage_upper_bound': 1.0}
+            logger.warning("[Controller] Insufficient data from diagnostics. Defaulting to safe mode.")
+            return DiagnosticStats(qber_mean=0.5, qber_upper_bound=1.0, leakage_upper_bound=1.0)
 
-        errors = sum(a != b for a,b in zip(sifted_alice, sifted_bob))
         qber_mean = errors / sifted_len
-        
-        # Calculate the 95% confidence interval for the QBER
-        qber_std_error = math.sqrt((qber_mean * (1 - qber_mean)) / sifted_len)
-        qber_upper_bound = qber_mean + self.z_score * qber_std_error
 
         # Estimate leakage with uncertainty
-        leakage_mean = true_source_leakage + rng.normalvariate(0, 0.005)
+        leakage_mean = true_source_leakage + rng.normal(0, 0.005)
         
         # CRITICAL FIX: Ensure the mean is not negative before statistical calculations.
         # A measured rate can never be less than zero.
-        leakage_mean_clipped = max(0, leakage_mean)
+        means = np.array([qber_mean, max(0.0, leakage_mean)])
 
-        # A more realistic model for the standard error of a rate measurement.
-        leakage_std_error = math.sqrt(leakage_mean_clipped * (1 - leakage_mean_clipped) / num_test_rounds) + 0.001
-        
-        leakage_upper_bound = leakage_mean_clipped + self.z_score * leakage_std_error
+        # Both 95% confidence intervals in one expression: [QBER, leakage].
+        # The leakage standard error carries a 0.001 floor, a more realistic
+        # model for the standard error of a rate measurement.
+        sample_sizes = np.array([sifted_len, num_test_rounds])
+        std_errors = np.sqrt(means * (1 - means) / sample_sizes) + _STD_ERROR_FLOOR
+        qber_upper_bound, leakage_upper_bound = np.maximum(means + self.z_score * std_errors, 0.0).tolist()
         
-        stats = {
-            'qber_mean': qber_mean,
-            'qber_upper_bound': max(0, qber_upper_bound),
-            'leakage_upper_bound': max(0, leakage_upper_bound)
-        }
+        stats = DiagnosticStats(qber_mean, qber_upper_bound, leakage_upper_bound)
         
-        print(f"[Controller] Diagnostics complete. Sifted {sifted_len} bits.")
-        print(f"  -> Est. QBER: {stats['qber_mean']:.2%} (95% CI upper bound: {stats['qber_upper_bound']:.2%})")
-        print(f"  -> Est. Leakage 95% CI upper bound: {stats['leakage_upper_bound']:.2%}")
+        logger.debug("[Controller] Diagnostics complete. Sifted %d bits.", sifted_len)
+        logger.debug("  -> Est. QBER: %.2f%% (95%% CI upper bound: %.2f%%)", stats.qber_mean * 100, stats.qber_upper_bound * 100)
+        logger.debug("  -> Est. Leakage 95%% CI upper bound: %.2f%%", stats.leakage_upper_bound * 100)
         return stats
 
-    def make_adaptive_decision(self, diagnostic_stats: dict) -> Dict[str, Any]:
+    def make_adaptive_decision(self, diagnostic_stats: DiagnosticStats) -> Dict[str, Any]:
         """
         Makes a high-confidence, adversarially-safe decision.
         """
-        is_qber_safe = diagnostic_stats['qber_upper_bound'] < self.qber_threshold
-        is_leakage_safe = diagnostic_stats['leakage_upper_bound'] < self.leakage_threshold
+        is_qber_safe = diagnostic_stats.qber_upper_bound < self.qber_threshold
+        is_leakage_safe = diagnostic_stats.leakage_upper_bound < self.leakage_threshold
 
         if is_qber_safe and is_leakage_safe:
-            print(f"  -> Decision: System HEALTHY. Confidence is high. Mode: 'NoLock'")
+            logger.debug("  -> Decision: System HEALTHY. Confidence is high. Mode: 'NoLock'")
             return {'mode': 'NoLock', 'locking_depth': 0}
         else:
-            print(f"  -> Decision: THREAT DETECTED or high uncertainty. Defaulting to safe mode. Mode: 'Lock'")
+            logger.debug("  -> Decision: THREAT DETECTED or high uncertainty. Defaulting to safe mode. Mode: 'Lock'")
             return {'mode': 'Lock', 'locking_depth': 8}
 
 if __name__ == "__main__":
     # The test block can remain as is, it will now use this superior engine.
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
     print("--- Testing Advanced TEAL Controller ---")
-    test_rng = random.Random(123)
+    test_rng = np.random.default_rng(123)
     controller = TEALController()
     
     print("\n[Test Case 1: Clean Environment]")
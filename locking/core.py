@@ -1,8 +1,14 @@
 # locking/core.py
 
+import cmath
+import functools
+import math
 import random
 import numpy as np
-from typing import List, Tuple
+from dataclasses import dataclass
+from typing import Iterator, List, Tuple
+
+from utils.quantum_ops import COMPLEX_DTYPE
 
 # =============================================================================
 # TEAL Simulator - The Locking Core
@@ -17,68 +23,157 @@ from typing import List, Tuple
 AbstractGate = Tuple[str, int, int, np.ndarray, np.ndarray]
 CompiledGate = Tuple
 
+# --- Compiled gate kinds ---
+OP_G = 0
+OP_SWAP = 1
+
 # --- Vetted Helper ---
 def random_single_qubit_rotation_from_rng(rng: np.random.RandomState) -> np.ndarray:
     phi = rng.uniform(0, 2 * np.pi)
     theta = np.arccos(rng.uniform(-1, 1))
     lam = rng.uniform(0, 2 * np.pi)
-    Rz1 = np.array([[np.exp(-1j*phi/2), 0],[0, np.exp(1j*phi/2)]], dtype=complex)
-    Ry  = np.array([[np.cos(theta/2), -np.sin(theta/2)],[np.sin(theta/2), np.cos(theta/2)]], dtype=complex)
-    Rz2 = np.array([[np.exp(-1j*lam/2), 0],[0, np.exp(1j*lam/2)]], dtype=complex)
-    return Rz1 @ Ry @ Rz2
+    # Closed form of Rz(phi) @ Ry(theta) @ Rz(lam), built in one allocation.
+    c, s = math.cos(theta / 2), math.sin(theta / 2)
+    e_sum = cmath.exp(0.5j * (phi + lam))
+    e_diff = cmath.exp(0.5j * (phi - lam))
+    return np.array([[c / e_sum, -s / e_diff], [s * e_diff, c * e_sum]], dtype=COMPLEX_DTYPE)
+
+def random_single_qubit_rotations_from_rng(rng: np.random.RandomState, count: int) -> np.ndarray:
+    """
+    Batched `random_single_qubit_rotation_from_rng`: returns a (count, 2, 2) array.
+    Consumes the generator exactly like `count` sequential calls, so gate lists
+    are unchanged for a given seed.
+    """
+    u = rng.random_sample((count, 3)) # (phi, cos(theta), lam) draws, in call order
+    half_theta = np.arccos(-1.0 + 2.0 * u[:, 1]) / 2
+    c, s = np.cos(half_theta), np.sin(half_theta)
+    phi, lam = 2 * np.pi * u[:, 0], 2 * np.pi * u[:, 2]
+    e_sum = np.exp(0.5j * (phi + lam))
+    e_diff = np.exp(0.5j * (phi - lam))
+    rotations = np.empty((count, 2, 2), dtype=COMPLEX_DTYPE)
+    rotations[:, 0, 0] = c / e_sum
+    rotations[:, 0, 1] = -s / e_diff
+    rotations[:, 1, 0] = s * e_diff
+    rotations[:, 1, 1] = c * e_sum
+    return rotations
 
 # --- Vetted Abstract Circuit Generators ---
 
-def build_adaptive_braid_v4_gate_list(
-    n_qubits: int, 
-    depth: int, 
-    seed: int, 
-    p_initial: float = 0.5, 
-    p_final: float = 0.05
-) -> List[AbstractGate]:
-    """ Generates an 'Adaptive Braid' gate list (our v4 flagship model). """
+@functools.lru_cache(maxsize=None)
+def _long_range_pairs(n_qubits: int) -> Tuple[Tuple[int, int], ...]:
+    """ All ordered (control, target) pairs more than one site apart, built once per size. """
+    return tuple((i, j) for i in range(n_qubits) for j in range(n_qubits) if abs(i-j) > 1)
+
+@functools.lru_cache(maxsize=256)
+def _build_adaptive_braid_v4_cached(
+    n_qubits: int, depth: int, seed: int, p_initial: float, p_final: float
+) -> Tuple[AbstractGate, ...]:
+    """ Memoized body of `build_adaptive_braid_v4_gate_list`; the rotations are read-only. """
     rng_py = random.Random(seed)
     rng_np = np.random.RandomState(seed)
     gates = []
-    long_range_pairs = [ (i,j) for i in range(n_qubits) for j in range(n_qubits) if abs(i-j)>1 ]
+    long_range_pairs = _long_range_pairs(n_qubits)
+    rotations = random_single_qubit_rotations_from_rng(rng_np, 2 * depth)
+    # The gates share rows of `rotations` with every later cache hit.
+    rotations.setflags(write=False)
+    prob_slope = (p_final - p_initial) / (depth - 1) if depth > 1 else 0.0
+    p_start = p_initial if depth > 1 else p_final
     for step in range(depth):
-        current_prob = p_initial + (p_final - p_initial) * (step / (depth - 1)) if depth > 1 else p_final
+        current_prob = p_start + prob_slope * step
         if rng_py.random() < current_prob and n_qubits >= 4:
-            control, target = rng_py.choice(long_range_pairs)
+            # randrange(len) draws exactly as random.choice would.
+            control, target = long_range_pairs[rng_py.randrange(len(long_range_pairs))]
         else:
             i = rng_py.randint(0, n_qubits - 2)
             control, target = i, i + 1
             if rng_py.random() < 0.5:
                 control, target = target, control
-        Rc = random_single_qubit_rotation_from_rng(rng_np)
-        Rt = random_single_qubit_rotation_from_rng(rng_np)
-        gates.append(('G', control, target, Rc, Rt))
-    return gates
+        gates.append(('G', control, target, rotations[2 * step], rotations[2 * step + 1]))
+    return tuple(gates)
+
+def build_adaptive_braid_v4_gate_list(
+    n_qubits: int, 
+    depth: int, 
+    seed: int, 
+    p_initial: float = 0.5, 
+    p_final: float = 0.05
+) -> List[AbstractGate]:
+    """
+    Generates an 'Adaptive Braid' gate list (our v4 flagship model).
+    The list is a pure function of its arguments, so repeat calls reuse a
+    cached build; the shared rotation matrices are read-only.
+    """
+    return list(_build_adaptive_braid_v4_cached(n_qubits, depth, seed, p_initial, p_final))
 
 def build_random_unitary_fair_gate_list(n_qubits: int, depth: int, seed: int) -> List[AbstractGate]:
     """ Generates a 'Purely Random' gate list for baseline comparison. """
     rng_py = random.Random(seed + 9999)
     rng_np = np.random.RandomState(seed + 9999)
     gates = []
-    for _ in range(depth):
+    rotations = random_single_qubit_rotations_from_rng(rng_np, 2 * depth)
+    for step in range(depth):
         control, target = rng_py.sample(range(n_qubits), 2)
-        Rc = random_single_qubit_rotation_from_rng(rng_np)
-        Rt = random_single_qubit_rotation_from_rng(rng_np)
-        gates.append(('G', control, target, Rc, Rt))
+        gates.append(('G', control, target, rotations[2 * step], rotations[2 * step + 1]))
     return gates
 
 # --- Vetted Hardware-Aware Compiler ---
 
-def compile_circuit(n_qubits: int, gate_list: List[AbstractGate]) -> List[CompiledGate]:
+@dataclass
+class CompiledCircuit:
+    """
+    Structure-of-arrays form of a compiled circuit with M physical gates.
+    Gate k is `op_kinds[k]` (OP_G or OP_SWAP) acting on (`ctrls[k]`, `tgts[k]`);
+    for OP_G gates `mats[k]` holds the (Rc, Rt) rotation pair, for SWAPs it is zero.
+    Iterating yields the legacy ('G', c, t, Rc, Rt) / ('SWAP', a, b) tuples.
+    """
+    op_kinds: np.ndarray # uint8[M]
+    ctrls: np.ndarray    # int32[M]
+    tgts: np.ndarray     # int32[M]
+    mats: np.ndarray     # COMPLEX_DTYPE[M, 2, 2, 2]
+
+    def __len__(self) -> int:
+        return self.op_kinds.size
+
+    def __iter__(self) -> Iterator[CompiledGate]:
+        for k, (kind, c, t) in enumerate(zip(self.op_kinds.tolist(), self.ctrls.tolist(), self.tgts.tolist())):
+            if kind == OP_SWAP:
+                yield ('SWAP', c, t)
+            else:
+                yield ('G', c, t, self.mats[k, 0], self.mats[k, 1])
+
+def compile_circuit(n_qubits: int, gate_list: List[AbstractGate]) -> CompiledCircuit:
     """ Compiles an abstract gate list for a linear-chain hardware topology. """
-    compiled = []
+    # A gate spanning distance d > 1 becomes d-1 SWAPs in, the gate, and d-1 SWAPs back.
+    num_ops = sum(2 * abs(c - t) - 1 for _, c, t, _, _ in gate_list)
+    op_kinds = np.full(num_ops, OP_SWAP, dtype=np.uint8)
+    ctrls = np.empty(num_ops, dtype=np.int32)
+    tgts = np.empty(num_ops, dtype=np.int32)
+    mats = np.zeros((num_ops, 2, 2, 2), dtype=COMPLEX_DTYPE)
+
+    # One cursor walks the output; each SWAP path is generated from its
+    # endpoints, out towards the target and then back in reverse.
+    k = 0
     for _, c, t, Rc, Rt in gate_list:
-        if abs(c - t) == 1:
-            compiled.append(('G', c, t, Rc, Rt))
-        else:
-            path = list(range(c, t, 1 if c < t else -1))
-            swaps = list(zip(path, path[1:]))
-            for a, b in swaps: compiled.append(('SWAP', a, b))
-            compiled.append(('G', path[-1], t, Rc, Rt))
-            for a, b in reversed(swaps): compiled.append(('SWAP', a, b))
-    return compiled
\ No newline at end of file
+        step = 1 if c < t else -1
+        g_c = t - step
+        for a in range(c, g_c, step):
+            ctrls[k], tgts[k] = a, a + step; k += 1
+        op_kinds[k], ctrls[k], tgts[k] = OP_G, g_c, t
+        mats[k, 0], mats[k, 1] = Rc, Rt; k += 1
+        for a in range(g_c - step, c - step, -step):
+            ctrls[k], tgts[k] = a, a + step; k += 1
+    return CompiledCircuit(op_kinds, ctrls, tgts, mats)
+
+@functools.lru_cache(maxsize=256)
+def compile_adaptive_braid_v4(
+    n_qubits: int, depth: int, seed: int, p_initial: float = 0.5, p_final: float = 0.05
+) -> CompiledCircuit:
+    """
+    Builds and compiles an Adaptive Braid lock in one memoized step, so sweeps
+    that revisit the same (n_qubits, depth, seed) skip both passes. The
+    returned circuit is shared between callers and its arrays are read-only.
+    """
+    circuit = compile_circuit(n_qubits, build_adaptive_braid_v4_gate_list(n_qubits, depth, seed, p_initial, p_final))
+    for arr in (circuit.op_kinds, circuit.ctrls, circuit.tgts, circuit.mats):
+        arr.setflags(write=False)
+    return circuit
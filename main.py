@@ -1,7 +1,11 @@
-# main_aether.py
+# main.py
 
-import random
-from typing import Dict, Any
+import copy
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Any, Tuple
+
+import numpy as np
 
 from protocols.bb84 import run_bb84_protocol
 from protocols.decoy_mdi_v2 import run_decoy_mdi_protocol
@@ -10,6 +14,13 @@ from protocols.teal_e import run_teal_e_protocol
 from controller.immune_system import TEALController
 from controller.aether_controller import AETHERController
 
+# Named environments: (signals, loss, noise, leakage, seed).
+TOTAL_SIGNALS = 20000
+ENVIRONMENTS = {
+    "CLEAN, HEALTHY": (TOTAL_SIGNALS, 0.02, 0.001, 0.0, 1),
+    "HOSTILE (High Noise & Leakage)": (TOTAL_SIGNALS, 0.02, 0.03, 0.03, 2),
+}
+
 def print_results(protocol_name: str, results: Dict[str, Any], total_qubits: int):
     print(f"\n--- RESULTS for {protocol_name} ---")
     if results.get('mode_chosen'): print(f"Controller Mode: {results['mode_chosen']}")
@@ -21,49 +32,106 @@ def print_results(protocol_name: str, results: Dict[str, Any], total_qubits: int
     print(f"Sifted Key: {sifted_len} bits (Efficiency: {sift_rate:.3%})")
     print(f"Final QBER (Observed): {qber:.3%}"); print(f"Secure Key Rate (Finite-Key): {skr:.5f} bits/qubit"); print(f"Est. Final Key: {final_key} bits")
 
-def run_comparison(env_name: str, signals: int, loss: float, noise: float, leakage: float, seed: int):
-    print("\n" + "="*70 + f"\nEXPERIMENT: Simulating a {env_name} environment\n" + "="*70)
-    print(f"Parameters: Signals={signals}, Loss={loss:.1%}, Noise={noise:.1%}, Leakage={leakage:.1%}\n")
-    
-    bb84 = run_bb84_protocol(signals, loss, noise, leakage, seed)
-    mdi = run_decoy_mdi_protocol(signals, loss, noise, leakage, seed)
-
-    aether_controller = AETHERController()
-    chosen_protocol = aether_controller.choose_protocol(noise, leakage, random.Random(seed))
-    
+def _run_aether_protocol(chosen_protocol: str, signals: int, loss: float, noise: float, leakage: float, seed: int, rng) -> Tuple[Dict[str, Any], str]:
+    """Runs the protocol the AETHER controller deployed; returns its results and report name."""
     if chosen_protocol == "TEAL":
         aether_results = run_teal_protocol(
             num_qubits=signals, block_size=4,
             channel_loss_prob=loss, hardware_noise_prob=noise,
-            source_leakage_prob=leakage, controller=TEALController(), rng_seed=seed
+            source_leakage_prob=leakage, controller=TEALController(), rng_seed=seed, rng=rng
         )
-        aether_name = "AETHER System (deploying TEAL Fortress)"
+        return aether_results, "AETHER System (deploying TEAL Fortress)"
+    aether_results = run_teal_e_protocol(
+        num_qubits=signals, hardware_noise_prob=noise,
+        source_leakage_prob=leakage, rng_seed=seed, rng=rng
+    )
+    return aether_results, "AETHER System (deploying TEAL-E Racer)"
+
+def simulate_comparison(signals: int, loss: float, noise: float, leakage: float, seed: int, executor: Executor = None) -> Dict[str, Any]:
+    """
+    Runs every protocol for one environment and returns the raw results.
+    Pure compute with no console report, so it can run in a worker process.
+    A single master generator seeded from `seed` spawns an independent child
+    stream per stage, so each protocol's results are reproducible and do not
+    depend on how many draws the stages before it consumed. That also makes
+    the three protocol runs independent: given an `executor`, they run
+    concurrently on it with identical results.
+    """
+    bb84_rng, mdi_rng, controller_rng, aether_rng = np.random.default_rng(seed).spawn(4)
+
+    aether_controller = AETHERController()
+    chosen_protocol = aether_controller.choose_protocol(noise, leakage, controller_rng)
+
+    jobs = {
+        'bb84': (run_bb84_protocol, signals, loss, noise, leakage, seed, bb84_rng),
+        'mdi': (run_decoy_mdi_protocol, signals, loss, noise, leakage, seed, mdi_rng),
+        'aether': (_run_aether_protocol, chosen_protocol, signals, loss, noise, leakage, seed, aether_rng),
+    }
+    if executor is None:
+        results = {name: fn(*args) for name, (fn, *args) in jobs.items()}
     else:
-        aether_results = run_teal_e_protocol(
-            num_qubits=signals, hardware_noise_prob=noise,
-            source_leakage_prob=leakage, rng_seed=seed
-        )
-        aether_name = "AETHER System (deploying TEAL-E Racer)"
+        futures = {name: executor.submit(fn, *args) for name, (fn, *args) in jobs.items()}
+        results = {name: future.result() for name, future in futures.items()}
+
+    aether_results, aether_name = results['aether']
+    return {'bb84': results['bb84'], 'mdi': results['mdi'], 'aether': aether_results, 'aether_name': aether_name}
+
+def present_comparison(env_name: str, signals: int, loss: float, noise: float, leakage: float, results: Dict[str, Any]):
+    """Prints the report for one environment from `simulate_comparison` results."""
+    bb84, mdi, aether_results = results['bb84'], results['mdi'], results['aether']
+
+    print("\n" + "="*70 + f"\nEXPERIMENT: Simulating a {env_name} environment\n" + "="*70)
+    print(f"Parameters: Signals={signals}, Loss={loss:.1%}, Noise={noise:.1%}, Leakage={leakage:.1%}\n")
 
     print_results("BB84 (Classic)", bb84, signals)
     print_results("Decoy-State MDI (State-of-the-Art)", mdi, signals)
-    print_results(aether_name, aether_results, signals)
+    print_results(results['aether_name'], aether_results, signals)
     
-    skrs = [
-        (bb84['secure_key_rate'], "BB84"),
-        (mdi['secure_key_rate'], "Decoy-State MDI"),
-        (aether_results['secure_key_rate'], "AETHER System")
-    ]
+    verdict = [("BB84", bb84), ("Decoy-State MDI", mdi), ("AETHER System", aether_results)]
     
     print("\n" + "-"*30 + " FINAL VERDICT " + "-"*30)
-    for name, rate in [(n, r['secure_key_rate']) for r,n in [(bb84,"BB84"),(mdi,"Decoy-MDI"),(aether_results,"AETHER")]]:
-        print(f"{name} SKR: {rate:.5f}")
+    for name, res in verdict:
+        print(f"{name} SKR: {res['secure_key_rate']:.5f}")
     
-    winner = max(skrs)
-    print(f"\nCONCLUSION: {winner[1]} WINS in this environment.")
+    winner = max(verdict, key=lambda v: v[1]['secure_key_rate'])
+    print(f"\nCONCLUSION: {winner[0]} WINS in this environment.")
     print("="*70)
 
+# Results of the named environments simulated so far, kept in the driver
+# process. Each environment is fully determined by its seed.
+_ENVIRONMENT_RESULTS: Dict[str, Dict[str, Any]] = {}
+
+def simulate_environments(env_keys, executor: Executor = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Simulates the named `ENVIRONMENTS`, reusing any this process already ran.
+    Missing ones run on `executor` when given. Callers get their own copies,
+    so mutating a result never affects later lookups.
+    """
+    missing = [key for key in env_keys if key not in _ENVIRONMENT_RESULTS]
+    if executor is None:
+        _ENVIRONMENT_RESULTS.update((key, simulate_comparison(*ENVIRONMENTS[key])) for key in missing)
+    else:
+        futures = {key: executor.submit(simulate_comparison, *ENVIRONMENTS[key]) for key in missing}
+        _ENVIRONMENT_RESULTS.update((key, future.result()) for key, future in futures.items())
+    return {key: copy.deepcopy(_ENVIRONMENT_RESULTS[key]) for key in env_keys}
+
+def run_comparison(env_name: str, signals: int, loss: float, noise: float, leakage: float, seed: int, executor: Executor = None):
+    """Simulates and reports one environment; see `simulate_comparison` for `executor`."""
+    results = simulate_comparison(signals, loss, noise, leakage, seed, executor)
+    present_comparison(env_name, signals, loss, noise, leakage, results)
+
+def run_environment(env_key: str):
+    """Simulates (or recalls) and reports one of the named `ENVIRONMENTS`."""
+    present_comparison(env_key, *ENVIRONMENTS[env_key][:4], simulate_environments([env_key])[env_key])
+
+def main():
+    """Simulates and reports every named environment."""
+    # The environments are independent, so simulate them concurrently, then
+    # report each one from the memoized results.
+    with ProcessPoolExecutor(max_workers=min(len(ENVIRONMENTS), os.cpu_count() or 1)) as pool:
+        simulate_environments(ENVIRONMENTS, pool)
+    for key in ENVIRONMENTS:
+        run_environment(key)
+
 if __name__ == "__main__":
-    TOTAL_SIGNALS = 20000
-    run_comparison("CLEAN, HEALTHY", TOTAL_SIGNALS, 0.02, 0.001, 0.0, 1)
-    run_comparison("HOSTILE (High Noise & Leakage)", TOTAL_SIGNALS, 0.02, 0.03, 0.03, 2)
+    main()
@@ -1,8 +1,12 @@
 # physics/evolution.py
 
-import random
+import functools
+from collections import Counter
+
 import numpy as np
-from typing import List, Tuple, Dict
+from typing import Iterable, List, Tuple
+
+from utils.quantum_ops import COMPLEX_DTYPE
 
 # =============================================================================
 # TEAL Simulator - The Physics Engine
@@ -20,80 +24,91 @@ from typing import List, Tuple, Dict
 
 # --- Type Aliases for clarity ---
 QuantumState = np.ndarray
-GatePrimitive = np.ndarray
 CompiledGate = Tuple
-CompiledCircuit = List[CompiledGate]
+# Any iterable of compiled gate tuples: a plain list, or the
+# locking.core.CompiledCircuit dataclass, which iterates as one.
+CompiledGates = Iterable[CompiledGate]
 
 # --- Vetted Quantum Objects ---
-I2 = np.eye(2, dtype=complex)
-CNOT_2 = np.array([[1,0,0,0], [0,1,0,0], [0,0,0,1], [0,0,1,0]], dtype=complex)
-SWAP_2 = np.array([[1,0,0,0], [0,0,1,0], [0,1,0,0], [0,0,0,1]], dtype=complex)
 PAULI_1Q_LIST = [
-    np.eye(2, dtype=complex),
-    np.array([[0,1],[1,0]], dtype=complex), # X
-    np.array([[0,-1j],[1j,0]], dtype=complex), # Y
-    np.array([[1,0],[0,-1]], dtype=complex)  # Z
+    np.eye(2, dtype=COMPLEX_DTYPE),
+    np.array([[0,1],[1,0]], dtype=COMPLEX_DTYPE), # X
+    np.array([[0,-1j],[1j,0]], dtype=COMPLEX_DTYPE), # Y
+    np.array([[1,0],[0,-1]], dtype=COMPLEX_DTYPE)  # Z
 ]
 
-def local_pair_gate_from_rotations(Rc: np.ndarray, Rt: np.ndarray) -> GatePrimitive:
-    """Creates the standard 2-qubit gate primitive: rotations then CNOT."""
-    return CNOT_2 @ np.kron(Rc, Rt)
-
-def _gate_on_n(gate: GatePrimitive, n_qubits: int, targets: List[int]) -> GatePrimitive:
-    """
-    The robust, basis-sum embedding function. This is the internal workhorse.
-    It correctly embeds a k-qubit gate onto a full n-qubit Hilbert space.
-    """
-    # This function is a direct copy of the vetted, correct logic from our
-    # final OTOC experiment. Its complexity is warranted for its correctness.
-    targets = list(targets); k = len(targets)
-    if gate.shape != (2**k, 2**k): raise ValueError("Gate dims mismatch")
-    
-    sorted_targets = sorted(targets)
-    if sorted_targets != targets:
-        perm = [targets.index(t) for t in sorted_targets]
-        dim = 2**k; P = np.zeros((dim, dim), dtype=complex)
-        for i in range(dim):
-            bits_in = [int(c) for c in f'{i:0{k}b}']
-            bits_out = [bits_in[p] for p in perm]
-            P[int("".join(map(str, bits_out)), 2), i] = 1.0
-        gate_local = P @ gate @ P.T
-        targets_use = sorted_targets
-    else:
-        gate_local = gate
-        targets_use = targets
-
-    D = 2**n_qubits; full = np.zeros((D, D), dtype=complex)
-    
-    other_indices = [i for i in range(n_qubits) if i not in targets_use]
-    
-    for i in range(D):
-        bits_i = [int(c) for c in f'{i:0{n_qubits}b}']
-        local_bits_i = [bits_i[t] for t in targets_use]
-        other_bits_i = [bits_i[t] for t in other_indices]
-        local_idx_i = int("".join(map(str, local_bits_i)), 2)
-        
-        row_from_gate = gate_local[:, local_idx_i]
-        
-        for j_local, amplitude in enumerate(row_from_gate):
-            if abs(amplitude) > 1e-9:
-                bits_j_local = [int(c) for c in f'{j_local:0{k}b}']
-                bits_j = [0] * n_qubits
-                for idx, t in enumerate(targets_use): bits_j[t] = bits_j_local[idx]
-                for idx, t in enumerate(other_indices): bits_j[t] = other_bits_i[idx]
-                
-                j = int("".join(map(str, bits_j)), 2)
-                full[j, i] = amplitude
-    return full
+def _apply_single_qubit_gate(psi_t: np.ndarray, gate: np.ndarray, axis: int) -> np.ndarray:
+    """Applies a 2x2 gate to one axis of a rank-n state tensor of shape (2,)*n."""
+    return np.moveaxis(np.tensordot(gate, psi_t, axes=([1], [axis])), 0, axis)
+
+def _apply_pauli_pair(psi_t: np.ndarray, a: int, b: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Applies a random non-identity Pauli to each of axes a and b. The two
+    2x2 Paulis act on their own axes, so no 4x4 kron is ever formed.
+    """
+    psi_t = _apply_single_qubit_gate(psi_t, PAULI_1Q_LIST[rng.integers(1, 4)], a)
+    return _apply_single_qubit_gate(psi_t, PAULI_1Q_LIST[rng.integers(1, 4)], b)
+
+def _apply_swap(psi_t: np.ndarray, a: int, b: int) -> np.ndarray:
+    """A SWAP of qubits a and b is just an exchange of their tensor axes (a view)."""
+    return np.swapaxes(psi_t, a, b)
+
+def _apply_rotations_then_cnot(psi_t: np.ndarray, Rc: np.ndarray, Rt: np.ndarray, a: int, b: int) -> np.ndarray:
+    """
+    Applies the compiled 'G' gate to sorted axes a < b: the local rotations
+    Rc on axis a and Rt on axis b, then a CNOT with control a and target b.
+    No 4x4 gate matrix is formed.
+    """
+    psi_t = _apply_single_qubit_gate(psi_t, Rc, a)
+    psi_t = _apply_single_qubit_gate(psi_t, Rt, b)
+    # CNOT: where the control is 1, exchange the target's two amplitudes. The
+    # contractions above returned a fresh array, so this may write in place.
+    control_one = (slice(None),) * a + (1,)
+    psi_t[control_one] = np.flip(psi_t[control_one], axis=b - 1)
+    return psi_t
+
+def _apply_compiled_gate(psi_t: np.ndarray, gate_type: str, args: Tuple) -> Tuple[np.ndarray, List[int]]:
+    """Applies one compiled gate on its sorted targets; returns the state and those targets."""
+    if gate_type == 'SWAP':
+        targets = sorted(args)
+        return _apply_swap(psi_t, *targets), targets
+    c, t, Rc, Rt = args; targets = sorted([c,t])
+    return _apply_rotations_then_cnot(psi_t, np.asarray(Rc, dtype=COMPLEX_DTYPE), np.asarray(Rt, dtype=COMPLEX_DTYPE), *targets), targets
 
 # -----------------------------------------------------------------------------
 # SECTION 2: THE PUBLIC-FACING PHYSICS ENGINE FUNCTIONS
 # -----------------------------------------------------------------------------
 
-def build_unitary_from_compiled(n_qubits: int, compiled_list: CompiledCircuit) -> np.ndarray:
+class CircuitApplicator:
+    """
+    A compiled circuit as a linear operator that is applied gate by gate,
+    without ever materializing its 2^n x 2^n unitary. `applicator @ psi`
+    accepts a state vector of length 2^n or a (2^n, m) matrix whose columns
+    are states, at O(depth * 4 * 2^n) work per column.
+    """
+    def __init__(self, n_qubits: int, compiled_list: CompiledGates):
+        self.n_qubits = n_qubits
+        self.gates = []
+        for gate_type, *args in compiled_list:
+            if gate_type == 'G':
+                c, t, Rc, Rt = args
+                args = (c, t, np.asarray(Rc, dtype=COMPLEX_DTYPE), np.asarray(Rt, dtype=COMPLEX_DTYPE))
+            self.gates.append((gate_type, tuple(args)))
+
+    def __matmul__(self, psi: np.ndarray) -> np.ndarray:
+        psi = np.asarray(psi, dtype=COMPLEX_DTYPE)
+        psi_t = psi.reshape((2,) * self.n_qubits + psi.shape[1:])
+        for gate_type, args in self.gates:
+            psi_t, _ = _apply_compiled_gate(psi_t, gate_type, args)
+        return psi_t.reshape(psi.shape)
+
+def build_unitary_from_compiled(n_qubits: int, compiled_list: CompiledGates) -> np.ndarray:
     """
     Constructs the final, ideal (noiseless) unitary matrix from a compiled circuit.
     This is essential for the "unlocking" operation in the TEAL protocol.
+    The gates are contracted onto the columns of the identity rather than
+    multiplied together as embedded 2^n x 2^n matrices; callers that only
+    need U @ psi can use `CircuitApplicator` directly.
 
     Args:
         n_qubits: The number of qubits in the system.
@@ -102,22 +117,61 @@ def build_unitary_from_compiled(n_qubits: int, compiled_list: CompiledCircuit) -
     Returns:
         The final 2^n x 2^n unitary matrix for the entire circuit.
     """
-    U = np.eye(2**n_qubits, dtype=complex)
+    return CircuitApplicator(n_qubits, compiled_list) @ np.eye(2**n_qubits, dtype=COMPLEX_DTYPE)
+
+def _hashable_circuit(compiled_list: CompiledGates) -> Tuple:
+    """A hashable, value-based form of a compiled circuit: rotations become bytes."""
+    key = []
     for gate_type, *args in compiled_list:
         if gate_type == 'SWAP':
-            a, b = args; local_gate = SWAP_2; targets = sorted([a,b])
-        elif gate_type == 'G':
-            c, t, Rc, Rt = args; local_gate = local_pair_gate_from_rotations(Rc, Rt); targets = sorted([c,t])
-        
-        U_gate = _gate_on_n(local_gate, n_qubits, targets)
-        U = U_gate @ U
+            key.append(('SWAP', *args))
+        else:
+            c, t, Rc, Rt = args
+            key.append(('G', c, t, np.asarray(Rc, dtype=COMPLEX_DTYPE).tobytes(), np.asarray(Rt, dtype=COMPLEX_DTYPE).tobytes()))
+    return tuple(key)
+
+@functools.lru_cache(maxsize=32)
+def _lock_unitary_cached(n_qubits: int, circuit_key: Tuple) -> np.ndarray:
+    compiled_list = [
+        gate if gate[0] == 'SWAP' else
+        ('G', gate[1], gate[2], np.frombuffer(gate[3], dtype=COMPLEX_DTYPE).reshape(2, 2), np.frombuffer(gate[4], dtype=COMPLEX_DTYPE).reshape(2, 2))
+        for gate in circuit_key
+    ]
+    U = build_unitary_from_compiled(n_qubits, compiled_list)
+    U.setflags(write=False)
     return U
 
+def build_lock_unitary(n_qubits: int, compiled_list: CompiledGates) -> np.ndarray:
+    """
+    Returns the dense unitary U_lock of a compiled circuit. Results are
+    memoized on the circuit's gates and rotation values, so repeat runs with
+    the same lock skip the build; the shared matrix is read-only.
+    No unlock matrix is built: the unlock fidelity |<psi|U_lock^dag psi_final>|^2
+    equals |<U_lock psi|psi_final>|^2, which only needs the ideal locked state.
+    """
+    return _lock_unitary_cached(n_qubits, _hashable_circuit(compiled_list))
+
+# Largest state dimension for which the dense lock unitary (8 * D^2 bytes at
+# complex64, 8 MB at D = 2^10) is built and cached. Bigger locks are applied
+# gate by gate, which needs O(D) memory per state instead of O(D^2).
+_DENSE_LOCK_MAX_DIM = 2**10
+
+def apply_lock_batch(psi_batch: np.ndarray, n_qubits: int, compiled_list: CompiledGates) -> np.ndarray:
+    """
+    Applies the ideal (noiseless) lock circuit to a (num_blocks, 2^n) batch
+    of states, one per row. Small locks use one GEMM against the cached dense
+    U_lock; above _DENSE_LOCK_MAX_DIM the gates are streamed over the whole
+    batch with `CircuitApplicator`, so no 2^n x 2^n matrix is materialized.
+    """
+    if 2**n_qubits <= _DENSE_LOCK_MAX_DIM:
+        return psi_batch @ build_lock_unitary(n_qubits, compiled_list).T
+    return (CircuitApplicator(n_qubits, compiled_list) @ psi_batch.T).T
+
 def evolve_state_vector_noisily(
     initial_psi: QuantumState,
-    compiled_list: CompiledCircuit,
+    compiled_list: CompiledGates,
     noise_p: float,
-    rng: random.Random
+    rng: np.random.Generator
 ) -> QuantumState:
     """
     Evolves a quantum state vector through a noisy, compiled quantum circuit.
@@ -130,29 +184,70 @@ def evolve_state_vector_noisily(
         rng: A random number generator for reproducible noise.
 
     Returns:
-        The final, noisy n-qubit state vector after the full evolution.
+        The final, noisy n-qubit state vector after the full evolution. For an
+        empty circuit this is a view of `initial_psi` itself.
     """
     n_qubits = int(np.log2(len(initial_psi)))
-    psi = initial_psi.copy()
+    # The state stays a rank-n tensor for the whole circuit; it is only
+    # flattened back to a vector on exit. No defensive copy is taken: every
+    # gate contraction returns a fresh array, so `initial_psi` (which may be a
+    # read-only cached state) is never written to.
+    psi_t = initial_psi.astype(COMPLEX_DTYPE, copy=False).reshape((2,) * n_qubits)
 
     for gate_type, *args in compiled_list:
-        if gate_type == 'SWAP':
-            a, b = args; local_gate = SWAP_2; targets = sorted([a,b])
-        elif gate_type == 'G':
-            c, t, Rc, Rt = args; local_gate = local_pair_gate_from_rotations(Rc, Rt); targets = sorted([c,t])
-        
         # 1. Apply the ideal gate evolution
-        U_gate = _gate_on_n(local_gate, n_qubits, targets)
-        psi = U_gate @ psi
+        psi_t, targets = _apply_compiled_gate(psi_t, gate_type, args)
 
         # 2. Apply the stochastic noise model (Pauli Twirl)
         if noise_p > 0 and rng.random() < noise_p:
             # Pick a random non-identity Pauli for each of the two qubits.
-            pauli_1 = PAULI_1Q_LIST[rng.randint(1, 3)]
-            pauli_2 = PAULI_1Q_LIST[rng.randint(1, 3)]
-            
-            noise_gate = np.kron(pauli_1, pauli_2)
-            noise_op = _gate_on_n(noise_gate, n_qubits, targets)
-            psi = noise_op @ psi
+            psi_t = _apply_pauli_pair(psi_t, *targets, rng)
             
-    return psi
\ No newline at end of file
+    return psi_t.reshape(-1)
+
+def evolve_state_batch_noisily(
+    psi_batch: np.ndarray,
+    compiled_list: CompiledGates,
+    noise_p: float,
+    rng: np.random.Generator
+) -> np.ndarray:
+    """
+    `evolve_state_vector_noisily` over a (num_states, 2^n) batch, one state per
+    row. Rows are evolved in order with the same generator and written into
+    one preallocated output batch.
+    """
+    psi_out = np.empty(psi_batch.shape, dtype=COMPLEX_DTYPE)
+    for b, psi in enumerate(psi_batch):
+        psi_out[b] = evolve_state_vector_noisily(psi, compiled_list, noise_p, rng)
+    return psi_out
+
+def pair_error_model(compiled_list: CompiledGates, noise_p: float) -> Tuple[List[Tuple[int, int]], np.ndarray]:
+    """
+    Accumulated Pauli-twirl error model of a compiled circuit. Returns the
+    distinct (sorted) qubit pairs its gates act on and, per pair, the chance
+    1-(1-noise_p)**count that at least one of the `count` gates on it errs.
+    """
+    counts = Counter(tuple(sorted(args[:2])) for _, *args in compiled_list)
+    support = sorted(counts)
+    return support, 1 - (1 - noise_p) ** np.array([counts[pair] for pair in support], dtype=float)
+
+def apply_lumped_pauli_twirl_batch(
+    psi_batch: np.ndarray,
+    support: List[Tuple[int, int]],
+    pair_error_p: np.ndarray,
+    rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Lumped end-of-circuit version of the Pauli-twirl noise model, applied
+    in place to the rows of a (num_states, 2^n) batch after the ideal
+    unitary, instead of gate-by-gate `evolve_state_vector_noisily`. Each
+    pair of the circuit's `support` errs independently with its accumulated
+    probability from `pair_error_model`, receiving a random non-identity
+    Pauli on each of its two qubits. One uniform per (row, pair) decides
+    the errors; only the rows that err are touched.
+    """
+    n_qubits = int(np.log2(psi_batch.shape[1]))
+    errs = rng.random((len(psi_batch), len(support))) < pair_error_p
+    for row, k in zip(*np.nonzero(errs)):
+        psi_batch[row] = _apply_pauli_pair(psi_batch[row].reshape((2,) * n_qubits), *support[k], rng).reshape(-1)
+    return psi_batch
@@ -1,8 +1,7 @@
 # postprocessing/error_correction.py
 import math
-def shannon_entropy(p):
-    if p <= 0 or p >= 1: return 0.0
-    return -p * math.log2(p) - (1 - p) * math.log2(1 - p)
+
+from utils.entropy import shannon_entropy
 
 def calculate_error_correction_cost(sifted_key: list, qber: float, efficiency: float = 1.1) -> (list, int):
     """
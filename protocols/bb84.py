@@ -1,30 +1,34 @@
 # protocols/bb84.py
 
-import random
 import numpy as np
 from typing import Dict, Any
 
 # --- Import all our perfected, modular components ---
-from components.sources import prepare_bb84_qubit
-from components.channels import apply_lossy_channel
-from components.relays import measure_qubit
+from components.sources import prepare_bb84_qubits
+from components.channels import lossy_channel_survival_mask
+from components.relays import measure_qubits
 from analysis.key_rate import secure_key_rate
+from analysis._bits import count_bit_errors
+from utils.quantum_ops import COMPLEX_DTYPE
+from utils.rng import random_bits
 
-# Vetted quantum objects needed for the noise model
-I2 = np.eye(2, dtype=complex)
-PAULI_1Q_LIST = [
-    np.eye(2, dtype=complex),
-    np.array([[0,1],[1,0]], dtype=complex), # X
-    np.array([[0,-1j],[1j,0]], dtype=complex), # Y
-    np.array([[1,0],[0,-1]], dtype=complex)  # Z
-]
+# Vetted quantum objects needed for the noise model: the four single-qubit
+# Paulis (I, X, Y, Z), stacked in the qubits' own precision so the noise
+# matmul stays in that precision.
+PAULI_1Q_STACK = np.array([
+    [[1,0],[0,1]],
+    [[0,1],[1,0]], # X
+    [[0,-1j],[1j,0]], # Y
+    [[1,0],[0,-1]]  # Z
+], dtype=COMPLEX_DTYPE)
 
 def run_bb84_protocol(
     num_qubits: int,
     channel_loss_prob: float,
     hardware_noise_prob: float,
     source_leakage_prob: float,
-    rng_seed: int
+    rng_seed: int,
+    rng: np.random.Generator = None
 ) -> Dict[str, Any]:
     """
     A faithful, physically-grounded simulation of the BB84 protocol.
@@ -34,46 +38,45 @@ def run_bb84_protocol(
     - Channel loss.
     - A final key rate calculation that accounts for source leakage, against
       which BB84 has no architectural defense.
+
+    A shared `rng` may be passed in; otherwise one is seeded from `rng_seed`.
     """
-    rng = random.Random(rng_seed)
+    rng = rng if rng is not None else np.random.default_rng(rng_seed)
     
     # --- Alice's Preparation ---
-    alice_key = [rng.randint(0, 1) for _ in range(num_qubits)]
-    alice_bases = [rng.randint(0, 1) for _ in range(num_qubits)]
+    alice_key = random_bits(rng, num_qubits)
+    alice_bases = random_bits(rng, num_qubits)
     
     # --- Bob's Preparation ---
-    bob_bases = [rng.randint(0, 1) for _ in range(num_qubits)]
+    bob_bases = random_bits(rng, num_qubits)
+    
+    # --- Simulation (one array row per qubit) ---
+    # 1. Alice prepares all her ideal qubits with one table lookup
+    qubits = prepare_bb84_qubits(alice_key, alice_bases)
+    
+    # 2. Hardware noise is applied at the source
+    noisy = np.flatnonzero(rng.random(num_qubits) < hardware_noise_prob)
+    # Apply a random, non-identity Pauli error (X, Y, or Z) to each noisy qubit
+    error_gates = PAULI_1Q_STACK[rng.integers(1, 4, size=noisy.size)]
+    qubits[noisy] = np.matmul(error_gates, qubits[noisy, :, None])[:, :, 0]
+    
+    # 3. Qubits travel through the lossy channel
+    survived = lossy_channel_survival_mask(channel_loss_prob, num_qubits, rng)
     
-    # --- Simulation Loop ---
-    sifted_alice, sifted_bob = [], []
-    for i in range(num_qubits):
-        
-        # 1. Alice prepares her ideal qubit
-        qubit = prepare_bb84_qubit(alice_key[i], alice_bases[i])
-        
-        # 2. Hardware noise is applied at the source
-        if rng.random() < hardware_noise_prob:
-            # Apply a random, non-identity Pauli error (X, Y, or Z)
-            error_gate = PAULI_1Q_LIST[rng.randint(1, 3)]
-            qubit = error_gate @ qubit
-        
-        # 3. Qubit travels through the lossy channel
-        qubit_after_channel = apply_lossy_channel(qubit, channel_loss_prob, rng)
-        
-        # 4. Bob measures the qubit
-        bob_measurement = measure_qubit(qubit_after_channel, bob_bases[i])
+    # 4. Bob measures every qubit (lost ones are discarded by the sifting)
+    bob_measurements = measure_qubits(qubits, bob_bases, rng)
 
-        # 5. Sifting Condition
-        if bob_measurement is not None and alice_bases[i] == bob_bases[i]:
-            sifted_alice.append(alice_key[i])
-            sifted_bob.append(bob_measurement)
+    # 5. Sifting Condition
+    sifted = survived & (alice_bases == bob_bases)
+    sifted_alice = alice_key[sifted]
+    sifted_bob = bob_measurements[sifted]
+    sifted_len = sifted_alice.size
 
     # --- Analysis ---
-    sifted_len = len(sifted_alice)
     if sifted_len == 0:
         return {'qber': 0, 'secure_key_rate': 0, 'sifted_key_length': 0}
     
-    errors = sum(a != b for a, b in zip(sifted_alice, sifted_bob))
+    errors = count_bit_errors(sifted_alice, sifted_bob)
     qber = errors / sifted_len
     sifting_eff = sifted_len / num_qubits
     
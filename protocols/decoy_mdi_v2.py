@@ -1,44 +1,26 @@
-# protocols/decoy_mdi_v3.py
+# protocols/decoy_mdi_v2.py
 
-import random
+import numpy as np
 from typing import Dict, Any
 
-from components.sources import prepare_bb84_qubit
-from components.channels import apply_lossy_channel
+from components.bsm import bsm_success_mask, sift_bsm_rounds
 from analysis.finite_key_analysis_v2 import calculate_finite_key_rate
+from analysis._bits import count_bit_errors
+from utils.rng import random_bits
 
-def _bsm_mdi(qa, qb, ak, bk, ab, bb, rng):
-    """
-    Simulate a simplified Bell-State Measurement (BSM) for MDI-QKD.
-
-    Args:
-        qa, qb: Qubit states after channel.
-        ak, bk: Alice and Bob's bit values.
-        ab, bb: Alice and Bob's bases (0=X, 1=Z).
-        rng: random.Random instance.
-
-    Returns:
-        "psi_plus", "psi_minus", or "fail"
-    """
-    if qa is None or qb is None:
-        return "fail"
-
-    # BSM only works if bases match
-    if ab == bb:
-        # Simplified 50% probabilistic outcome
-        if ak == bk:
-            return "psi_plus" if rng.random() < 0.5 else "fail"
-        else:
-            return "psi_minus" if rng.random() < 0.5 else "fail"
-    return "fail"
-
+# Decoy-state types and their probabilities. Rounds draw an integer index
+# into this table, so the sifting masks compare integers, not strings.
+STATE_TYPES = ("signal", "decoy", "vacuum")
+STATE_PROBS = (0.8, 0.1, 0.1)
+SIGNAL = STATE_TYPES.index("signal")
 
 def run_decoy_mdi_protocol(
     num_qubits: int,
     channel_loss_prob: float,
     hardware_noise_prob: float,
     source_leakage_prob: float,
-    rng_seed: int
+    rng_seed: int,
+    rng: np.random.Generator = None
 ) -> Dict[str, Any]:
     """
     Run a simplified decoy-state MDI-QKD simulation.
@@ -57,57 +39,39 @@ def run_decoy_mdi_protocol(
         hardware_noise_prob: probability of a bit flip in the hardware
         source_leakage_prob: probability Eve has partial source info
         rng_seed: seed for reproducible randomness
+        rng: optional shared generator; seeded from rng_seed when omitted
 
     Returns:
         Dictionary containing SKR, QBER, sifting efficiency, etc.
     """
-    rng = random.Random(rng_seed)
-
-    # Decoy-state probabilities
-    state_probs = {"signal": 0.8, "decoy": 0.1, "vacuum": 0.1}
+    rng = rng if rng is not None else np.random.default_rng(rng_seed)
 
     # Generate raw keys, bases, and decoy types for Alice and Bob
-    alice_key = [rng.randint(0, 1) for _ in range(num_qubits)]
-    alice_bases = [rng.randint(0, 1) for _ in range(num_qubits)]
-    alice_types = rng.choices(list(state_probs.keys()), weights=list(state_probs.values()), k=num_qubits)
-
-    bob_key = [rng.randint(0, 1) for _ in range(num_qubits)]
-    bob_bases = [rng.randint(0, 1) for _ in range(num_qubits)]
-    bob_types = rng.choices(list(state_probs.keys()), weights=list(state_probs.values()), k=num_qubits)
-
-    sifted_alice, sifted_bob = [], []
-
-    for i in range(num_qubits):
-        # Only signal-signal rounds contribute to the key
-        if alice_types[i] != "signal" or bob_types[i] != "signal":
-            continue
-
-        # Prepare qubits after hardware noise
-        if rng.random() < hardware_noise_prob:
-            alice_key[i] ^= 1
-        if rng.random() < hardware_noise_prob:
-            bob_key[i] ^= 1
-
-        qubit_a = prepare_bb84_qubit(alice_key[i], alice_bases[i])
-        qubit_b = prepare_bb84_qubit(bob_key[i], bob_bases[i])
-
-        # Apply channel loss
-        qa_channel = apply_lossy_channel(qubit_a, channel_loss_prob, rng)
-        qb_channel = apply_lossy_channel(qubit_b, channel_loss_prob, rng)
-
-        # Perform simplified BSM
-        bsm_result = _bsm_mdi(qa_channel, qb_channel, alice_key[i], bob_key[i], alice_bases[i], bob_bases[i], rng)
-
-        # Basis matching and BSM success
-        if alice_bases[i] == bob_bases[i] and bsm_result != "fail":
-            sifted_alice.append(alice_key[i])
-            if bsm_result == "psi_minus":
-                sifted_bob.append(1 - bob_key[i])
-            else:
-                sifted_bob.append(bob_key[i])
-
-    sifted_len = len(sifted_alice)
-    errors = sum(a != b for a, b in zip(sifted_alice, sifted_bob))
+    alice_key = random_bits(rng, num_qubits)
+    alice_bases = random_bits(rng, num_qubits)
+    alice_types = rng.choice(len(STATE_TYPES), size=num_qubits, p=STATE_PROBS)
+
+    bob_key = random_bits(rng, num_qubits)
+    bob_bases = random_bits(rng, num_qubits)
+    bob_types = rng.choice(len(STATE_TYPES), size=num_qubits, p=STATE_PROBS)
+
+    # Only signal-signal rounds contribute to the key
+    signal_rounds = (alice_types == SIGNAL) & (bob_types == SIGNAL)
+
+    # Hardware noise (a bit flip), for every round at once
+    bit_flips = rng.random((2, num_qubits)) < hardware_noise_prob
+    alice_key ^= bit_flips[0]
+    bob_key ^= bit_flips[1]
+
+    # Simplified BSM: both photons must arrive and the bases must match; it
+    # then announces Psi+ (equal bits) or Psi- (different bits) with a 50%
+    # probabilistic outcome.
+    success = signal_rounds & bsm_success_mask(alice_bases, bob_bases, channel_loss_prob, rng)
+    # A Psi- announcement means Bob flips his bit.
+    sifted_alice, sifted_bob = sift_bsm_rounds(alice_key, bob_key, success)
+    sifted_len = sifted_alice.size
+
+    errors = count_bit_errors(sifted_alice, sifted_bob)
 
     # Compute finite-key secure key rate
     results = calculate_finite_key_rate(
@@ -4,33 +4,28 @@ TEAL Protocol Implementation for AETHER.
 Supports both 'Lock' and 'NoLock' adaptive modes with block-based qubit processing.
 """
 
-import random
+import logging
+from concurrent.futures import Executor
+from itertools import repeat
+
 import numpy as np
 from typing import Dict, Any
 
-from components.sources import prepare_bb84_qubit
-from components.channels import apply_lossy_channel
+from components.sources import prepare_bb84_product_states
+from components.bsm import bsm_success_mask, sift_bsm_rounds
 from analysis.finite_key_analysis_v2 import calculate_finite_key_rate
-from locking.core import build_adaptive_braid_v4_gate_list, compile_circuit
-from physics.evolution import build_unitary_from_compiled, evolve_state_vector_noisily
+from analysis._bits import count_bit_errors
+from locking.core import compile_adaptive_braid_v4
+from physics.evolution import (
+    apply_lock_batch, apply_lumped_pauli_twirl_batch, evolve_state_batch_noisily, pair_error_model
+)
+from utils.rng import random_bits
 
+logger = logging.getLogger(__name__)
 
-def _bsm_mdi(qa, qb, ak, bk, ab, bb, rng):
-    """
-    Simplified Bell-State Measurement (MDI).
-    Returns 'psi_plus', 'psi_minus', or 'fail'.
-    """
-    if qa is None or qb is None:
-        return "fail"
-    if ab == bb:
-        if ak == bk and rng.random() < 0.5:
-            return "psi_plus"
-        elif ak != bk and rng.random() < 0.5:
-            return "psi_minus"
-        else:
-            return "fail"
-    else:
-        return "fail"
+# Exact-mode blocks are evolved in this many chunks, each with its own child
+# generator. A fixed count keeps results independent of the machine's cores.
+EXACT_CHUNKS = 8
 
 
 def run_teal_protocol(
@@ -40,7 +35,10 @@ def run_teal_protocol(
     hardware_noise_prob: float,
     source_leakage_prob: float,
     controller,
-    rng_seed: int
+    rng_seed: int,
+    rng: np.random.Generator = None,
+    exact: bool = False,
+    executor: Executor = None
 ) -> Dict[str, Any]:
     """
     Run the TEAL adaptive QKD protocol.
@@ -50,75 +48,83 @@ def run_teal_protocol(
     - hardware_noise_prob: per-qubit hardware error probability
     - source_leakage_prob: fraction of source-side leakage
     - controller: AETHER controller object (makes adaptive mode decisions)
-    - rng_seed: random number seed for reproducibility
+    - rng_seed: random number seed for reproducibility (also seeds the lock circuit)
+    - rng: optional shared generator; seeded from rng_seed when omitted
+    - exact: evolve each block gate by gate with per-gate Pauli noise instead of
+      applying the ideal lock unitary followed by lumped per-pair Pauli errors
+    - executor: optional executor the exact-mode block chunks are spread over;
+      results are identical with or without it
     """
-    rng = random.Random(rng_seed)
+    rng = rng if rng is not None else np.random.default_rng(rng_seed)
     total_qubits = num_qubits
 
     # --- Step 1: Controller diagnostics & adaptive decision ---
     stats = controller.run_diagnostics(2000, channel_loss_prob, source_leakage_prob, rng)
     decision = controller.make_adaptive_decision(stats)
     mode = decision['mode']
-    print(f"\n[TEAL Protocol] Starting in '{mode}' mode.")
+    logger.debug("[TEAL Protocol] Starting in '%s' mode.", mode)
 
     # --- Step 2: Prepare locking unitary if in 'Lock' mode ---
     if mode == 'Lock':
-        gate_list = build_adaptive_braid_v4_gate_list(block_size, decision['locking_depth'], rng_seed)
-        compiled_lock = compile_circuit(block_size, gate_list)
-        U_unlock = build_unitary_from_compiled(block_size, compiled_lock).conj().T
-        print(f"[TEAL Protocol] Lock engaged. Compiled depth: {len(compiled_lock)}.")
+        compiled_lock = compile_adaptive_braid_v4(block_size, decision['locking_depth'], rng_seed)
+        # Lumped noise: per qubit pair, the chance that any gate on it errs.
+        lock_support, lock_pair_error_p = pair_error_model(compiled_lock, hardware_noise_prob)
+        logger.debug("[TEAL Protocol] Lock engaged. Compiled depth: %d.", len(compiled_lock))
 
     # --- Step 3: Process qubits in blocks ---
-    sifted_alice, sifted_bob = [], []
+    # Blocks are independent, so every block's keys and bases are drawn at
+    # once as (num_blocks, block_size) arrays; only the lock needs a loop.
     num_blocks = num_qubits // block_size
-
-    for _ in range(num_blocks):
-        # Random key and basis for each qubit in the block
-        ak = [rng.randint(0, 1) for _ in range(block_size)]
-        ab = [rng.randint(0, 1) for _ in range(block_size)]
-        bk = [rng.randint(0, 1) for _ in range(block_size)]
-        bb = [rng.randint(0, 1) for _ in range(block_size)]
-
-        # Prepare initial state vector for the block
-        psi_init = np.eye(1, dtype=complex)
-        for i in range(block_size):
-            psi_init = np.kron(psi_init, prepare_bb84_qubit(ak[i], ab[i])) if i > 0 else prepare_bb84_qubit(ak[i], ab[i])
-
-        eff_ak = ak.copy()
-
-        # --- Step 3a: Apply locking unitary if required ---
-        if mode == 'Lock':
-            psi_final = evolve_state_vector_noisily(psi_init, compiled_lock, hardware_noise_prob, rng)
-            psi_unlocked = U_unlock @ psi_final
-            fidelity = np.abs(np.vdot(psi_init, psi_unlocked))**2
-            if rng.random() > fidelity:
-                eff_ak[rng.randint(0, block_size - 1)] ^= 1  # flip one qubit randomly
-
-        # --- Step 3b: Apply per-qubit noise and channel losses ---
-        for i in range(block_size):
-            if mode == 'NoLock' and rng.random() < hardware_noise_prob:
-                eff_ak[i] ^= 1
-            if rng.random() < hardware_noise_prob:
-                bk[i] ^= 1
-
-            qa = prepare_bb84_qubit(eff_ak[i], ab[i])
-            qb = prepare_bb84_qubit(bk[i], bb[i])
-
-            qa = apply_lossy_channel(qa, channel_loss_prob, rng)
-            qb = apply_lossy_channel(qb, channel_loss_prob, rng)
-
-            announce = _bsm_mdi(qa, qb, eff_ak[i], bk[i], ab[i], bb[i], rng)
-
-            if announce != "fail":
-                sifted_alice.append(eff_ak[i])
-                if announce == "psi_minus":
-                    sifted_bob.append(1 - bk[i])
-                else:
-                    sifted_bob.append(bk[i])
+    ak, ab, bk, bb = random_bits(rng, (4, num_blocks, block_size))
+    eff_ak = ak.copy()
+
+    # --- Step 3a: Apply locking unitary if required ---
+    # A noiseless (or empty) lock unlocks perfectly: the fidelity is exactly
+    # 1 and no block can fail, so the state evolution is skipped entirely.
+    if mode == 'Lock' and hardware_noise_prob > 0 and len(compiled_lock) > 0:
+        # Every block's initial state is a row of one (num_blocks, 2^n) matrix,
+        # so the ideal lock is applied to all blocks in one pass.
+        psi_init = prepare_bb84_product_states(ak, ab)
+        psi_ideal = apply_lock_batch(psi_init, block_size, compiled_lock)
+        if exact:
+            # Blocks are independent: split them into chunks, each driven by
+            # its own child generator, so they can run serially or on the
+            # executor with the same result.
+            chunks = np.array_split(psi_init, EXACT_CHUNKS)
+            chunk_args = (chunks, repeat(compiled_lock), repeat(hardware_noise_prob), rng.spawn(len(chunks)))
+            if executor is None:
+                psi_final = np.concatenate(list(map(evolve_state_batch_noisily, *chunk_args)))
+            else:
+                psi_final = np.concatenate(list(executor.map(evolve_state_batch_noisily, *chunk_args)))
+        else:
+            psi_final = apply_lumped_pauli_twirl_batch(psi_ideal.copy(), lock_support, lock_pair_error_p, rng)
+        # Unlock fidelity |<psi_init|U_lock^dag psi_final>|^2 = |<psi_ideal|psi_final>|^2,
+        # so no unlock product is needed. vecdot conjugates its first
+        # argument on the fly, without a conj() copy.
+        fidelity = np.abs(np.vecdot(psi_ideal, psi_final))**2
+        # A block that fails the fidelity test has one random qubit flipped.
+        failed = np.flatnonzero(rng.random(num_blocks) > fidelity)
+        eff_ak[failed, rng.integers(block_size, size=failed.size)] ^= 1
+
+    # --- Step 3b: Apply hardware noise, channel losses and the BSM as masks ---
+    # One draw gives both parties' bit flips. Under the lock, Alice's noise
+    # is already accounted for by the fidelity test.
+    bit_flips = rng.random((2,) + bk.shape) < hardware_noise_prob
+    if mode == 'NoLock':
+        eff_ak ^= bit_flips[0]
+    bk ^= bit_flips[1]
+
+    # Both photons must survive the channel and the bases must match; the
+    # simplified BSM then succeeds half the time.
+    success = bsm_success_mask(ab, bb, channel_loss_prob, rng)
+
+    # A Psi- announcement means Bob flips his bit. Boolean indexing keeps
+    # the block-by-block order of the sifted key.
+    sifted_alice, sifted_bob = sift_bsm_rounds(eff_ak, bk, success)
 
     # --- Step 4: Compute finite-key secure rate ---
-    sifted_len = len(sifted_alice)
-    errors = sum(a != b for a, b in zip(sifted_alice, sifted_bob))
+    sifted_len = sifted_alice.size
+    errors = count_bit_errors(sifted_alice, sifted_bob)
     leakage_final = source_leakage_prob if mode == 'NoLock' else 0.0
 
     results = calculate_finite_key_rate(
@@ -1,37 +1,33 @@
 # protocols/teal_e.py
-import random
+import numpy as np
 from typing import Dict, Any
-from components.sources import prepare_bb84_qubit
-from components.channels import apply_lossy_channel
 from components.entanglement_factory import EntanglementFactory
 from analysis.teal_e_analysis import run_teal_e_analysis
+from utils.rng import random_bits
 
 def run_teal_e_protocol(
     num_qubits: int,
     hardware_noise_prob: float,
     source_leakage_prob: float, # This argument is for interface compatibility
-    rng_seed: int
+    rng_seed: int,
+    rng: np.random.Generator = None
 ) -> Dict[str, Any]:
     
-    rng = random.Random(rng_seed)
+    rng = rng if rng is not None else np.random.default_rng(rng_seed)
     
     factory = EntanglementFactory(alice_channel_loss=0.02, bob_channel_loss=0.02)
     successful_pairs = factory.generate_entangled_pairs(num_qubits, rng)
     
-    sifted_alice, sifted_bob_raw = [], []
-    
-    for i in range(num_qubits):
-        if successful_pairs[i]:
-            alice_measurement = rng.randint(0, 1)
-            bob_measurement = 1 - alice_measurement
-            
-            if rng.random() < hardware_noise_prob: alice_measurement ^= 1
-            if rng.random() < hardware_noise_prob: bob_measurement ^= 1
-                
-            sifted_alice.append(alice_measurement)
-            sifted_bob_raw.append(bob_measurement)
+    # Each pair yields anti-correlated bits; hardware noise flips each side
+    # independently. All draws are made for the successful pairs in bulk.
+    sifted_len = np.count_nonzero(successful_pairs)
+    sifted_alice = random_bits(rng, sifted_len)
+    sifted_bob_raw = 1 - sifted_alice
+    bit_flips = rng.random((2, sifted_len)) < hardware_noise_prob
+    sifted_alice ^= bit_flips[0]
+    sifted_bob_raw ^= bit_flips[1]
 
-    sifted_bob_reconciled = [1 - b for b in sifted_bob_raw]
+    sifted_bob_reconciled = 1 - sifted_bob_raw
 
     # TEAL-E is architecturally immune to source leakage, so we pass 0 to the analysis.
     final_results = run_teal_e_analysis(
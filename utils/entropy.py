@@ -0,0 +1,26 @@
+# utils/entropy.py
+
+from math import log, log1p
+
+import numpy as np
+
+# 1 / ln(2): converts natural-log entropies to bits without calling log2.
+_LN2_INV = 1.4426950408889634
+
+def shannon_entropy_vec(p) -> np.ndarray:
+    """
+    Calculates the binary Shannon entropy H(p) element-wise over an array.
+    Entries with p <= 0 or p >= 1 are 0, matching `shannon_entropy`.
+    """
+    p = np.asarray(p, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        h = -_LN2_INV * (p * np.log(p) + (1 - p) * np.log1p(-p))
+    return np.where((p > 0) & (p < 1), h, 0.0)
+
+def shannon_entropy(p: float) -> float:
+    """
+    Calculates the binary Shannon entropy H(p) for a single probability.
+    Evaluated exactly; log1p keeps the (1-p) term accurate as p approaches 1.
+    """
+    if p <= 0 or p >= 1: return 0.0
+    return -_LN2_INV * (p * log(p) + (1 - p) * log1p(-p))
@@ -0,0 +1,9 @@
+# utils/quantum_ops.py
+
+import numpy as np
+
+# Amplitude dtype shared by every state vector, gate and rotation matrix.
+# QKD sifting only needs probabilities to ~1e-3, so single-precision complex
+# is ample; set this to np.complex128 to validate against full precision.
+# Defining it once keeps the modules from silently mixing precisions.
+COMPLEX_DTYPE = np.complex64